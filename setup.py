@@ -1,25 +1,34 @@
 #!/usr/bin/env python3
 
 import os
-import re
-from setuptools import setup
-from setuptools.command.test import test as TestCommand
+import sys
+from pathlib import Path
+from setuptools import setup, Command
 from setuptools.command.build_py import build_py as BuildCommand
 
-def read(fname):
-    with open(os.path.join(os.path.dirname(__file__), fname)) as fildes:
-        return fildes.read()
+HERE = Path(__file__).resolve().parent
+
+class PyTestCommand(Command):
+    description = 'run the test suite using pytest'
+    user_options = []
+
+    def initialize_options(self):
+        pass
 
-class NoseTestCommand(TestCommand):
     def finalize_options(self):
-        TestCommand.finalize_options(self)
-        self.test_args = []
-        self.test_suite = True
+        pass
 
-    def run_tests(self):
-        # Run nose ensuring that argv simulates running nosetests directly
-        import nose
-        nose.run_exit(argv=['nosetests'])
+    def run(self):
+        # Run the test modules in parallel. The tests are independent, but
+        # tests from the same module are kept on the same worker such that
+        # per-class scratch directories and cached results are only set up
+        # once.
+        import pytest
+        sys.exit(pytest.main([
+            '-n', 'auto', '--dist', 'loadfile',
+            '--cov=vhdeps', '--cov-report=xml', '--cov-report=term',
+            '--junitxml=test-results.xml',
+            'tests']))
 
 class BuildWithVersionCommand(BuildCommand):
     def run(self):
@@ -43,7 +52,7 @@ setup(
     license = 'Apache',
     keywords = 'vhdl dependency analyzer simulation',
     url = 'https://github.com/abs-tudelft/vhdeps',
-    long_description = read('README.md'),
+    long_description = (HERE / 'README.md').read_text(encoding='utf-8'),
     long_description_content_type = 'text/markdown',
     classifiers = [
         'Development Status :: 4 - Beta',
@@ -64,16 +73,27 @@ setup(
     ],
     setup_requires = [
         'better-setuptools-git-version',
-        'setuptools-lint',
-        'pylint',
     ],
     tests_require = [
-        'nose',
-        'coverage',
+        'pytest',
+        'pytest-xdist',
+        'pytest-cov',
         'lcov_cobertura',
     ],
+    extras_require = {
+        'lint': [
+            'setuptools-lint',
+            'pylint',
+        ],
+        'test': [
+            'pytest',
+            'pytest-xdist',
+            'pytest-cov',
+            'lcov_cobertura',
+        ],
+    },
     cmdclass = {
-        'test': NoseTestCommand,
+        'test': PyTestCommand,
         'build_py': BuildWithVersionCommand,
     },
 )
@@ -1,34 +1,61 @@
 """Common methods shared between test cases."""
 
+import os
 import sys
 import io
+import atexit
+import functools
+import builtins
+from contextlib import contextmanager, redirect_stdout, redirect_stderr
+from unittest.mock import patch
 import vhdeps
 
-try:
-    import builtins
-except ImportError:
-    import __builtin__ as builtins
+@functools.lru_cache(maxsize=None)
+def _devnull():
+    """Returns a file object for `os.devnull`, used to discard the output of
+    runs that don't capture it. It is only opened once per process, when it is
+    first needed, and closed when the process exits."""
+    devnull = open(os.devnull, 'w', encoding='utf-8') #pylint: disable=R1732
+    atexit.register(devnull.close)
+    return devnull
 
-def run_vhdeps(*args):
-    """Runs the given vhdeps CLI with mockup `sys.stdout` and `sys.stderr`.
-    Returns a three-tuple of the exit code, the captured stdout string, and the
-    captured stderr string."""
+@contextmanager
+def capture_output():
+    """Context manager that redirects `sys.stdout` and `sys.stderr` to a pair
+    of `io.StringIO` objects, which it yields. The captured output is only
+    echoed to the real stdout when the `VHDEPS_TEST_VERBOSE` environment
+    variable is set."""
     orig_out = sys.stdout
-    orig_err = sys.stderr
+    out = io.StringIO()
+    err = io.StringIO()
     try:
-        sys.stdout = io.StringIO()
-        sys.stderr = io.StringIO()
-        try:
-            code = vhdeps.run_cli(args)
-        finally:
-            out = sys.stdout.getvalue()
-            err = sys.stderr.getvalue()
-            print(out, file=orig_out)
-            print(err, file=orig_out)
-        return code, out, err
+        with redirect_stdout(out), redirect_stderr(err):
+            yield out, err
     finally:
-        sys.stdout = orig_out
-        sys.stderr = orig_err
+        if os.environ.get('VHDEPS_TEST_VERBOSE'):
+            print(out.getvalue(), file=orig_out)
+            print(err.getvalue(), file=orig_out)
+
+def run_vhdeps(*args, capture=True):
+    """Runs the given vhdeps CLI with mockup `sys.stdout` and `sys.stderr`.
+    Returns a three-tuple of the exit code, the captured stdout string, and the
+    captured stderr string, as captured by `capture_output()`. If `capture` is
+    false, the output is discarded instead and `None` is returned in place of
+    the strings."""
+    if not capture:
+        with redirect_stdout(_devnull()), redirect_stderr(_devnull()):
+            return vhdeps.run_cli(args), None, None
+    with capture_output() as (out, err):
+        code = vhdeps.run_cli(args)
+    return code, out.getvalue(), err.getvalue()
+
+def prepend_path(dirname):
+    """Returns a context manager that prepends `dirname` to the `PATH` that
+    plumbum uses to look up commands, such that the fake tools in it take
+    precedence over installed ones. Note that plumbum keeps its own copy of the
+    environment, so changing `os.environ` instead would not work."""
+    from plumbum import local #pylint: disable=C0415
+    return local.env(PATH=dirname + os.pathsep + local.env['PATH'])
 
 class MockMissingImport:
     """Patches Python's `__import__` function to raise an `ImportError` when
@@ -36,17 +63,18 @@ class MockMissingImport:
 
     def __init__(self, *names):
         super().__init__()
-        self._names = names
-        self._real_import = builtins.__import__
+        self._prefixes = tuple(names)
+        self._real_import = None
+        self._patcher = patch('builtins.__import__', new=self._patched_import)
 
     def _patched_import(self, name, *args, **kwargs):
-        for disabled_name in self._names:
-            if name.startswith(disabled_name):
-                raise ImportError(name)
+        if name.startswith(self._prefixes):
+            raise ImportError(name)
         return self._real_import(name, *args, **kwargs)
 
     def __enter__(self):
-        builtins.__import__ = self._patched_import
+        self._real_import = builtins.__import__
+        self._patcher.start()
 
     def __exit__(self, *_):
-        builtins.__import__ = self._real_import
+        self._patcher.stop()
@@ -10,75 +10,56 @@ DIR = os.path.realpath(os.path.dirname(__file__))
 class TestCommandLine(TestCase):
     """Tests the command-line interface."""
 
-    def test_no_args(self):
-        """Test vhdeps CLI with no arguments"""
-        code, _, err = run_vhdeps()
-        self.assertEqual(code, 1)
-        self.assertTrue('Error: no target specified.' in err)
+    @classmethod
+    def setUpClass(cls):
+        cls.EMPTY = os.path.join(DIR, 'simple', 'empty')
+        cls.ALL_GOOD = os.path.join(DIR, 'simple', 'all-good')
 
-    def test_help(self):
-        """Test vhdeps CLI --help switch"""
-        code, out, _ = run_vhdeps('--help')
-        self.assertEqual(code, 0)
-        self.assertTrue('vhdeps <target> [entities...] [flags...] [--] [target-flags...]' in out)
-
-    def test_target_list(self):
-        """Test vhdeps CLI --targets switch"""
-        code, out, _ = run_vhdeps('--targets')
-        self.assertEqual(code, 0)
-        self.assertTrue('ghdl' in out)
-        self.assertTrue('vsim' in out)
-        self.assertTrue('dump' in out)
-
-    def test_target_help(self):
-        """Test vhdeps CLI --help switch for targets and -- syntax"""
-        code, out, _ = run_vhdeps('dump', '--', '--help')
-        self.assertEqual(code, 0)
-        self.assertTrue('Generic compile order output to stdout' in out)
-
-    def test_style_help(self):
-        """Test vhdeps CLI --style switch"""
-        code, out, _ = run_vhdeps('--style')
-        self.assertEqual(code, 0)
-        self.assertTrue('The following style rules are enforced' in out)
-
-    def test_bad_target(self):
-        """Test vhdeps CLI unknown target error"""
-        code, _, err = run_vhdeps('not-a-target')
-        self.assertEqual(code, 1)
-        self.assertTrue('Error: unknown target "not-a-target".' in err)
-
-    def test_bad_path(self):
-        """Test vhdeps CLI bad path include error"""
-        code, _, err = run_vhdeps('dump', '-i', 'not-a-path')
-        self.assertEqual(code, 1)
-        self.assertTrue('ValueError: file/directory not found:' in err)
-
-    def test_empty_path(self):
-        """Test vhdeps no-files warning"""
-        code, _, err = run_vhdeps('dump', '-i', DIR+'/simple/empty')
-        self.assertEqual(code, 0)
-        self.assertTrue('Warning: no VHDL files found.' in err)
+    def test_messages(self):
+        """Test vhdeps CLI exit codes and messages for simple invocations"""
+        cases = [
+            # (description, arguments, exit code, stdout needles, stderr needles)
+            ('no arguments', (), 1,
+             [], ['Error: no target specified.']),
+            ('--help switch', ('--help',), 0,
+             ['vhdeps <target> [entities...] [flags...] [--] [target-flags...]'], []),
+            ('--targets switch', ('--targets',), 0,
+             ['ghdl', 'vsim', 'dump'], []),
+            ('--help switch for targets and -- syntax', ('dump', '--', '--help'), 0,
+             ['Generic compile order output to stdout'], []),
+            ('--style switch', ('--style',), 0,
+             ['The following style rules are enforced'], []),
+            ('unknown target error', ('not-a-target',), 1,
+             [], ['Error: unknown target "not-a-target".']),
+            ('bad path include error', ('dump', '-i', 'not-a-path'), 1,
+             [], ['ValueError: file/directory not found:']),
+            ('no-files warning', ('dump', '-i', self.EMPTY), 0,
+             [], ['Warning: no VHDL files found.']),
+            ('no design units warning', ('dump', 'nothing', '-i', self.ALL_GOOD), 0,
+             [], ['Warning: no design units found.']),
+        ]
+        for description, args, exp_code, exp_out, exp_err in cases:
+            with self.subTest(description):
+                code, out, err = run_vhdeps(*args)
+                self.assertEqual(code, exp_code)
+                for needle in exp_out:
+                    self.assertTrue(needle in out)
+                for needle in exp_err:
+                    self.assertTrue(needle in err)
 
     def test_stacktrace(self):
         """Test vhdeps CLI --stacktrace switch"""
         with self.assertRaises(ValueError):
-            run_vhdeps('dump', '-i', 'not-a-path', '--stacktrace')
+            run_vhdeps('dump', '-i', 'not-a-path', '--stacktrace', capture=False)
 
     def test_interrupt(self):
         """Test the KeyboardInterrupt handler"""
         with patch('vhdeps.vhdl.VhdList.add_dir', side_effect=KeyboardInterrupt):
-            code, _, _ = run_vhdeps('dump', '-i', DIR+'/simple/empty')
+            code, _, _ = run_vhdeps('dump', '-i', self.EMPTY, capture=False)
             self.assertEqual(code, 1)
 
     def test_interrupt_stacktrace(self):
         """Test the KeyboardInterrupt handler with --stacktrace"""
         with patch('vhdeps.vhdl.VhdList.add_dir', side_effect=KeyboardInterrupt):
             with self.assertRaises(KeyboardInterrupt):
-                run_vhdeps('dump', '-i', DIR+'/simple/empty', '--stacktrace')
-
-    def test_no_design_units(self):
-        """Test the no design units warning"""
-        code, _, err = run_vhdeps('dump', 'nothing', '-i', DIR+'/simple/all-good')
-        self.assertEqual(code, 0)
-        self.assertTrue('Warning: no design units found.' in err)
+                run_vhdeps('dump', '-i', self.EMPTY, '--stacktrace', capture=False)
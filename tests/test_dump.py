@@ -1,539 +1,497 @@
 """Tests the dependency analyzer and `dump` backend."""
 
 from unittest import TestCase
+from unittest.mock import patch
+from contextlib import contextmanager
 import os
+import functools
+import shutil
 import tempfile
-from plumbum import local
+from vhdeps import vhdl
 from .common import run_vhdeps
 
 DIR = os.path.realpath(os.path.dirname(__file__))
 
+# Common parts of the expected outputs.
+_TOP = 'top work 2008 '
+_TOP93 = 'top work 1993 '
+_MULTI = DIR + '/simple/multiple-ok/'
+_FILT = DIR + '/simple/filtering/'
+_ALL_GOOD = DIR + '/simple/all-good/'
+_TIMEOUT = DIR + '/simple/timeout/'
+_AMBIG = DIR + '/simple/ambiguous/'
+_COMP_CIRCLE = DIR + '/complex/component-circle/'
+_COMP_IN_INST = DIR + '/complex/component-in-inst/'
+_MULTI_UNIT = DIR + '/complex/multi-unit-design/'
+_VHLIB = DIR + '/complex/vhlib'
+
+def _ignore_non_vhdl(dirname, names):
+    """`shutil.copytree()` ignore function that skips everything but
+    directories and VHDL files."""
+    return [
+        name for name in names
+        if not os.path.isdir(os.path.join(dirname, name))
+        and not name.lower().endswith(vhdl.VHDL_EXTENSIONS)]
+
+@contextmanager
+def _cwd(dirname):
+    """Context manager that changes the working directory to `dirname`, and
+    restores the previous working directory on exit."""
+    orig_dirname = os.getcwd()
+    os.chdir(dirname)
+    try:
+        yield
+    finally:
+        os.chdir(orig_dirname)
+
+@functools.lru_cache(maxsize=None)
+def _run_dump(*args):
+    """Runs the dump target with the given arguments. Several tests need the
+    output for the same arguments, so the result is cached. Only use this for
+    invocations that don't depend on patched or otherwise changing state."""
+    return run_vhdeps('dump', *args)
+
+def _lines(*lines):
+    """Returns the given expected output lines with line terminators, to be
+    compared with `out.splitlines(keepends=True)` like `_vhlib_dump()`."""
+    return [line + '\n' for line in lines]
+
+@functools.lru_cache(maxsize=None)
+def _vhlib_dump(name, column=0):
+    """Returns the expected dump output for vhlib as stored in
+    `expected/<name>.txt`. Each line of that file consists of the kind of
+    file (top or dep), one or more VHDL version columns, and the path relative
+    to the vhlib directory. Runs that only differ in the VHDL versions share a
+    file; `column` selects the version column to use. The output is returned
+    as a list of lines including their line terminators, to be compared with
+    `out.splitlines(keepends=True)`; this is cheaper than joining everything
+    into a single string, and yields a line-oriented diff when the comparison
+    fails. The list is only built once per fixture and column, so it must not
+    be modified."""
+    with open(os.path.join(DIR, 'expected', name + '.txt'), 'r', encoding='utf-8') as fildes:
+        entries = [line.split() for line in fildes.read().splitlines()]
+    return [
+        '%s work %s %s/%s\n' % (entry[0], entry[1 + column], _VHLIB, entry[-1])
+        for entry in entries]
+
 class TestDump(TestCase):
     """Tests the dependency analyzer and `dump` backend."""
 
+    EXPECTED_MULTI_OK = '\n'.join([
+        _TOP + _MULTI + 'bar_tc.vhd',
+        _TOP + _MULTI + 'baz.vhd',
+        _TOP + _MULTI + 'foo_tc.vhd',
+    ]) + '\n'
+
+    @classmethod
+    def setUpClass(cls):
+        # Tests that need to write files share a single temporary directory.
+        cls.tempdir = tempfile.mkdtemp()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tempdir)
+
     def test_basic(self):
         """Test basic functionality of the dump backend"""
-        code, out, _ = run_vhdeps('dump', '-i', DIR + '/simple/multiple-ok')
+        code, out, _ = run_vhdeps('dump', '-i', _MULTI)
         self.assertEqual(code, 0)
-        self.assertEqual(out, '\n'.join([
-            'top work 2008 ' + DIR + '/simple/multiple-ok/bar_tc.vhd',
-            'top work 2008 ' + DIR + '/simple/multiple-ok/baz.vhd',
-            'top work 2008 ' + DIR + '/simple/multiple-ok/foo_tc.vhd',
-        ]) + '\n')
+        self.assertEqual(out, self.EXPECTED_MULTI_OK)
 
     def test_to_file(self):
         """Test outputting a dependency dump to a file"""
-        with tempfile.TemporaryDirectory() as tempdir:
-            code, _, _ = run_vhdeps(
-                'dump',
-                '-i', DIR + '/simple/multiple-ok',
-                '-o', tempdir+'/output')
-            self.assertEqual(code, 0)
-            with open(tempdir+'/output', 'r') as fildes:
-                self.assertEqual(fildes.read(), '\n'.join([
-                    'top work 2008 ' + DIR + '/simple/multiple-ok/bar_tc.vhd',
-                    'top work 2008 ' + DIR + '/simple/multiple-ok/baz.vhd',
-                    'top work 2008 ' + DIR + '/simple/multiple-ok/foo_tc.vhd',
-                ]) + '\n')
+        output_fname = os.path.join(self.tempdir, 'output')
+        code, _, _ = run_vhdeps(
+            'dump',
+            '-i', _MULTI,
+            '-o', output_fname, capture=False)
+        self.assertEqual(code, 0)
+        with open(output_fname, 'r', encoding='utf-8') as fildes:
+            self.assertEqual(fildes.read(), self.EXPECTED_MULTI_OK)
 
     def test_default_include(self):
         """Test implicit working directory inclusion"""
-        with local.cwd(DIR + '/simple/multiple-ok'):
+        with _cwd(_MULTI):
             code, out, err = run_vhdeps('dump')
         self.assertEqual(code, 0)
-        self.assertTrue('Including the current working directory recursively by default' in err)
-        self.assertEqual(out, '\n'.join([
-            'top work 2008 ' + DIR + '/simple/multiple-ok/bar_tc.vhd',
-            'top work 2008 ' + DIR + '/simple/multiple-ok/baz.vhd',
-            'top work 2008 ' + DIR + '/simple/multiple-ok/foo_tc.vhd',
-        ]) + '\n')
+        self.assertIn('Including the current working directory recursively by default', err)
+        self.assertEqual(out, self.EXPECTED_MULTI_OK)
 
     def test_default_include_by_file(self):
         """Test including files instead of directories"""
         code, out, _ = run_vhdeps(
             'dump',
-            '-i', DIR + '/simple/multiple-ok',
-            '-i', DIR + '/simple/all-good/test_tc.vhd')
+            '-i', _MULTI,
+            '-i', _ALL_GOOD + 'test_tc.vhd')
         self.assertEqual(code, 0)
-        self.assertEqual(out, '\n'.join([
-            'top work 2008 ' + DIR + '/simple/multiple-ok/bar_tc.vhd',
-            'top work 2008 ' + DIR + '/simple/multiple-ok/baz.vhd',
-            'top work 2008 ' + DIR + '/simple/multiple-ok/foo_tc.vhd',
-            'top work 2008 ' + DIR + '/simple/all-good/test_tc.vhd',
-        ]) + '\n')
+        self.assertEqual(
+            out, self.EXPECTED_MULTI_OK + _TOP + _ALL_GOOD + 'test_tc.vhd\n')
+
+    def test_duplicate_includes(self):
+        """Test that paths that were already included are skipped"""
+        code, expected, _ = _run_dump('-i', _VHLIB)
+        self.assertEqual(code, 0)
+        with patch.object(vhdl.VhdList, 'add_dir', autospec=True,
+                          side_effect=vhdl.VhdList.add_dir) as add_dir:
+            with patch.object(vhdl.VhdList, 'add_file', autospec=True,
+                              side_effect=vhdl.VhdList.add_file) as add_file:
+                code, out, _ = run_vhdeps(
+                    'dump',
+                    '-i', _VHLIB,
+                    '-i', _VHLIB + '/',
+                    '-i', _VHLIB + '/stream',
+                    '-i', _VHLIB + '/stream/StreamBuffer.vhd',
+                    '-i', _VHLIB + '/util/*.vhd')
+        self.assertEqual(code, 0)
+        self.assertEqual(out, expected)
+        self.assertEqual(add_dir.call_count, 1)
+        self.assertEqual(add_file.call_count, 0)
+
+        # Paths included into a different library are not skipped.
+        with patch.object(vhdl.VhdList, 'add_dir', autospec=True,
+                          side_effect=vhdl.VhdList.add_dir) as add_dir:
+            run_vhdeps(
+                'dump',
+                '-i', _VHLIB,
+                '-i', 'lib:' + _VHLIB + '/stream',
+                capture=False)
+        self.assertEqual(add_dir.call_count, 2)
+
+    def test_file_list(self):
+        """Test including files through a file list"""
+        list_fname = os.path.join(self.tempdir, 'files.lst')
+        with open(list_fname, 'w', encoding='utf-8') as fildes:
+            fildes.write('# vhlib sources\n\n')
+            for dirpath, _, fnames in os.walk(_VHLIB):
+                for fname in sorted(fnames):
+                    if fname.endswith('.vhd'):
+                        fildes.write(os.path.join(dirpath, fname) + '\n')
+        code, out, _ = run_vhdeps('dump', '-f', list_fname)
+        self.assertEqual(code, 0)
+        self.assertEqual(out.splitlines(keepends=True), _vhlib_dump('vhlib'))
 
     def test_default_include_by_glob(self):
         """Test including files using glob syntax"""
         code, out, _ = run_vhdeps(
             'dump',
-            '-i', DIR + '/simple/multiple-ok/ba*.vhd')
+            '-i', _MULTI + 'ba*.vhd')
         self.assertEqual(code, 0)
-        self.assertEqual(out, '\n'.join([
-            'top work 2008 ' + DIR + '/simple/multiple-ok/bar_tc.vhd',
-            'top work 2008 ' + DIR + '/simple/multiple-ok/baz.vhd',
-        ]) + '\n')
+        self.assertEqual(out.splitlines(keepends=True), _lines(
+            _TOP + _MULTI + 'bar_tc.vhd',
+            _TOP + _MULTI + 'baz.vhd',
+        ))
 
     def test_default_filters(self):
         """Test the default version/mode filters"""
-        code, out, _ = run_vhdeps('dump', '-i', DIR + '/simple/filtering')
+        code, out, _ = run_vhdeps('dump', '-i', _FILT)
         self.assertEqual(code, 0)
-        self.assertEqual(out, '\n'.join([
-            'top work 2008 ' + DIR + '/simple/filtering/new.08.vhd',
-            'top work 1993 ' + DIR + '/simple/filtering/old.93.vhd',
-            'top work 2008 ' + DIR + '/simple/filtering/simulation.sim.vhd',
-        ]) + '\n')
+        self.assertEqual(out.splitlines(keepends=True), _lines(
+            _TOP + _FILT + 'new.08.vhd',
+            _TOP93 + _FILT + 'old.93.vhd',
+            _TOP + _FILT + 'simulation.sim.vhd',
+        ))
 
     def test_fixed_version_1993(self):
         """Test the required version filter"""
-        code, out, _ = run_vhdeps('dump', '-i', DIR + '/simple/filtering', '-v93')
+        code, out, _ = run_vhdeps('dump', '-i', _FILT, '-v93')
         self.assertEqual(code, 0)
-        self.assertEqual(out, '\n'.join([
-            'top work 1993 ' + DIR + '/simple/filtering/old.93.vhd',
-            'top work 1993 ' + DIR + '/simple/filtering/simulation.sim.vhd',
-        ]) + '\n')
+        self.assertEqual(out.splitlines(keepends=True), _lines(
+            _TOP93 + _FILT + 'old.93.vhd',
+            _TOP93 + _FILT + 'simulation.sim.vhd',
+        ))
 
     def test_desired_version(self):
         """Test the desired version filter"""
-        code, out, _ = run_vhdeps('dump', '-i', DIR + '/simple/filtering', '-d93')
+        code, out, _ = run_vhdeps('dump', '-i', _FILT, '-d93')
         self.assertEqual(code, 0)
-        self.assertEqual(out, '\n'.join([
-            'top work 2008 ' + DIR + '/simple/filtering/new.08.vhd',
-            'top work 1993 ' + DIR + '/simple/filtering/old.93.vhd',
-            'top work 1993 ' + DIR + '/simple/filtering/simulation.sim.vhd',
-        ]) + '\n')
+        self.assertEqual(out.splitlines(keepends=True), _lines(
+            _TOP + _FILT + 'new.08.vhd',
+            _TOP93 + _FILT + 'old.93.vhd',
+            _TOP93 + _FILT + 'simulation.sim.vhd',
+        ))
 
     def test_synthesis(self):
         """Test the synthesis filter"""
-        code, out, _ = run_vhdeps('dump', '-i', DIR + '/simple/filtering', '-msyn')
+        code, out, _ = run_vhdeps('dump', '-i', _FILT, '-msyn')
         self.assertEqual(code, 0)
-        self.assertEqual(out, '\n'.join([
-            'top work 2008 ' + DIR + '/simple/filtering/new.08.vhd',
-            'top work 1993 ' + DIR + '/simple/filtering/old.93.vhd',
-            'top work 2008 ' + DIR + '/simple/filtering/synthesis.syn.vhd',
-        ]) + '\n')
+        self.assertEqual(out.splitlines(keepends=True), _lines(
+            _TOP + _FILT + 'new.08.vhd',
+            _TOP93 + _FILT + 'old.93.vhd',
+            _TOP + _FILT + 'synthesis.syn.vhd',
+        ))
 
     def test_no_filtering(self):
         """Test all filters disabled"""
-        code, out, _ = run_vhdeps('dump', '-i', DIR + '/simple/filtering', '-mall')
+        code, out, _ = run_vhdeps('dump', '-i', _FILT, '-mall')
         self.assertEqual(code, 0)
-        self.assertEqual(out, '\n'.join([
-            'top work 2008 ' + DIR + '/simple/filtering/new.08.vhd',
-            'top work 1993 ' + DIR + '/simple/filtering/old.93.vhd',
-            'top work 2008 ' + DIR + '/simple/filtering/simulation.sim.vhd',
-            'top work 2008 ' + DIR + '/simple/filtering/synthesis.syn.vhd',
-        ]) + '\n')
+        self.assertEqual(out.splitlines(keepends=True), _lines(
+            _TOP + _FILT + 'new.08.vhd',
+            _TOP93 + _FILT + 'old.93.vhd',
+            _TOP + _FILT + 'simulation.sim.vhd',
+            _TOP + _FILT + 'synthesis.syn.vhd',
+        ))
 
     def test_selected_entities(self):
         """Test toplevel entity selection"""
-        code, out, _ = run_vhdeps('dump', 'new', 'old', '-i', DIR + '/simple/filtering')
+        code, out, _ = run_vhdeps('dump', 'new', 'old', '-i', _FILT)
         self.assertEqual(code, 0)
-        self.assertEqual(out, '\n'.join([
-            'top work 2008 ' + DIR + '/simple/filtering/new.08.vhd',
-            'top work 1993 ' + DIR + '/simple/filtering/old.93.vhd',
-        ]) + '\n')
+        self.assertEqual(out.splitlines(keepends=True), _lines(
+            _TOP + _FILT + 'new.08.vhd',
+            _TOP93 + _FILT + 'old.93.vhd',
+        ))
 
     def test_selected_entity_glob(self):
         """Test toplevel entity selection with fnmatch globs"""
-        code, out, _ = run_vhdeps('dump', 's*', '-i', DIR + '/simple/filtering')
+        code, out, _ = run_vhdeps('dump', 's*', '-i', _FILT)
         self.assertEqual(code, 0)
-        self.assertEqual(out, '\n'.join([
-            'top work 2008 ' + DIR + '/simple/filtering/simulation.sim.vhd',
-        ]) + '\n')
+        self.assertEqual(out.splitlines(keepends=True), _lines(
+            _TOP + _FILT + 'simulation.sim.vhd',
+        ))
 
     def test_selected_entity_no_match(self):
         """Test toplevel entity selection with globs that don't match
         anything"""
-        code, out, err = run_vhdeps('dump', 's*', 'x*', '-i', DIR + '/simple/filtering')
+        code, out, err = run_vhdeps('dump', 's*', 'x*', '-i', _FILT)
         self.assertEqual(code, 0)
-        self.assertTrue('Warning: work.x* did not match anything.' in err)
-        self.assertEqual(out, '\n'.join([
-            'top work 2008 ' + DIR + '/simple/filtering/simulation.sim.vhd',
-        ]) + '\n')
+        self.assertIn('Warning: work.x* did not match anything.', err)
+        self.assertEqual(out.splitlines(keepends=True), _lines(
+            _TOP + _FILT + 'simulation.sim.vhd',
+        ))
 
     def test_conflict(self):
         """Test conflicting entities (defined in multiple files)"""
         code, _, err = run_vhdeps(
             'dump',
-            '-i', DIR + '/simple/all-good',
-            '-i', DIR + '/simple/timeout')
+            '-i', _ALL_GOOD,
+            '-i', _TIMEOUT)
         self.assertEqual(code, 1)
-        self.assertTrue('ResolutionError: entity work.test_tc is defined in '
-                        'multiple, ambiguous files:' in err)
+        self.assertIn('ResolutionError: entity work.test_tc is defined in '
+                      'multiple, ambiguous files:', err)
 
     def test_ignore_pragmas(self):
         """Test ignore-use pragmas"""
-        code, _, _ = run_vhdeps('dump', '-i', DIR + '/complex/ignore-use')
+        code, _, _ = run_vhdeps('dump', '-i', DIR + '/complex/ignore-use', capture=False)
         self.assertEqual(code, 0)
 
     def test_missing_package(self):
         """Test missing package detection/error"""
-        code, _, err = run_vhdeps('dump', '-i', DIR + '/complex/vhlib/util/UtilMem64_pkg.vhd')
+        code, _, err = run_vhdeps('dump', '-i', _VHLIB + '/util/UtilMem64_pkg.vhd')
         self.assertEqual(code, 1)
-        self.assertTrue('complex/vhlib/util/UtilMem64_pkg.vhd' in err)
-        self.assertTrue('could not find package work.utilstr_pkg' in err)
+        self.assertIn('complex/vhlib/util/UtilMem64_pkg.vhd', err)
+        self.assertIn('could not find package work.utilstr_pkg', err)
 
     def test_missing_component(self):
         """Test missing component detection/error"""
         code, _, err = run_vhdeps('dump', '-i', DIR + '/complex/missing-component')
         self.assertEqual(code, 1)
-        self.assertTrue('could not find component declaration for missing' in err)
+        self.assertIn('could not find component declaration for missing', err)
 
     def test_black_box_enforce(self):
         """Test black box detection/error"""
         code, _, err = run_vhdeps(
             'dump',
-            '-i', DIR + '/complex/vhlib/util',
-            '-i', DIR + '/complex/vhlib/stream/Stream_pkg.vhd',
-            '-i', DIR + '/complex/vhlib/stream/StreamBuffer.vhd')
+            '-i', _VHLIB + '/util',
+            '-i', _VHLIB + '/stream/Stream_pkg.vhd',
+            '-i', _VHLIB + '/stream/StreamBuffer.vhd')
         self.assertEqual(code, 1)
-        self.assertTrue('complex/vhlib/stream/StreamBuffer.vhd' in err)
-        self.assertTrue('black box: could not find entity work.streamfifo' in err)
+        self.assertIn('complex/vhlib/stream/StreamBuffer.vhd', err)
+        self.assertIn('black box: could not find entity work.streamfifo', err)
 
     def test_black_box_ignore(self):
         """Test ignoring a black box through the -x flag"""
         code, _, _ = run_vhdeps(
             'dump',
-            '-i', DIR + '/complex/vhlib/util',
-            '-x', DIR + '/complex/vhlib/stream/Stream_pkg.vhd',
-            '-i', DIR + '/complex/vhlib/stream/StreamBuffer.vhd')
+            '-i', _VHLIB + '/util',
+            '-x', _VHLIB + '/stream/Stream_pkg.vhd',
+            '-i', _VHLIB + '/stream/StreamBuffer.vhd', capture=False)
         self.assertEqual(code, 0)
 
     def test_missing_filtered(self):
         """Test detection of missing dependencies due to active filters"""
         code, _, err = run_vhdeps('dump', '-i', DIR + '/complex/missing-filtered')
         self.assertEqual(code, 1)
-        self.assertTrue('entity work.synth_only is defined, but only in files '
-                        'that were filtered out:' in err)
-        self.assertTrue('synth_only.syn.vhd is synthesis-only' in err)
+        self.assertIn('entity work.synth_only is defined, but only in files '
+                      'that were filtered out:', err)
+        self.assertIn('synth_only.syn.vhd is synthesis-only', err)
 
     def test_libraries(self):
         """Test multiple libraries"""
         code, out, _ = run_vhdeps(
             'dump',
-            '-i', DIR + '/simple/all-good',
-            '-i', 'timeout:' + DIR + '/simple/timeout')
+            '-i', _ALL_GOOD,
+            '-i', 'timeout:' + _TIMEOUT)
         self.assertEqual(code, 0)
-        self.assertEqual(out, '\n'.join([
-            'top timeout 2008 ' + DIR + '/simple/timeout/test_tc.vhd',
-            'top work 2008 ' + DIR + '/simple/all-good/test_tc.vhd',
-        ]) + '\n')
+        self.assertEqual(out.splitlines(keepends=True), _lines(
+            'top timeout 2008 ' + _TIMEOUT + 'test_tc.vhd',
+            'top work 2008 ' + _ALL_GOOD + 'test_tc.vhd',
+        ))
 
     def test_version_override(self):
         """Test version overrides in the include flag"""
         code, out, _ = run_vhdeps(
             'dump',
-            '-i', DIR + '/simple/all-good',
-            '-i', '93:timeout:' + DIR + '/simple/timeout')
+            '-i', _ALL_GOOD,
+            '-i', '93:timeout:' + _TIMEOUT)
         self.assertEqual(code, 0)
-        self.assertEqual(out, '\n'.join([
-            'top timeout 1993 ' + DIR + '/simple/timeout/test_tc.vhd',
-            'top work 2008 ' + DIR + '/simple/all-good/test_tc.vhd',
-        ]) + '\n')
+        self.assertEqual(out.splitlines(keepends=True), _lines(
+            'top timeout 1993 ' + _TIMEOUT + 'test_tc.vhd',
+            'top work 2008 ' + _ALL_GOOD + 'test_tc.vhd',
+        ))
 
     def test_ambiguous_08(self):
         """Test disambiguation by default desired version"""
-        code, out, _ = run_vhdeps('dump', '-i', DIR + '/simple/ambiguous')
+        code, out, _ = run_vhdeps('dump', '-i', _AMBIG)
         self.assertEqual(code, 0)
-        self.assertEqual(out, '\n'.join([
-            'top work 2008 ' + DIR + '/simple/ambiguous/test.08.sim.vhd',
-        ]) + '\n')
+        self.assertEqual(out.splitlines(keepends=True), _lines(
+            'top work 2008 ' + _AMBIG + 'test.08.sim.vhd',
+        ))
 
     def test_ambiguous_93(self):
         """Test disambiguation by specific desired version"""
-        code, out, _ = run_vhdeps('dump', '-i', DIR + '/simple/ambiguous', '-d', '93')
+        code, out, _ = run_vhdeps('dump', '-i', _AMBIG, '-d', '93')
         self.assertEqual(code, 0)
-        self.assertEqual(out, '\n'.join([
-            'top work 1993 ' + DIR + '/simple/ambiguous/test.93.sim.vhd',
-        ]) + '\n')
+        self.assertEqual(out.splitlines(keepends=True), _lines(
+            'top work 1993 ' + _AMBIG + 'test.93.sim.vhd',
+        ))
 
     def test_ambiguous_syn(self):
         """Test disambiguation by synthesis vs. simulation mode"""
-        code, out, _ = run_vhdeps('dump', '-i', DIR + '/simple/ambiguous', '-m', 'syn')
+        code, out, _ = run_vhdeps('dump', '-i', _AMBIG, '-m', 'syn')
         self.assertEqual(code, 0)
-        self.assertEqual(out, '\n'.join([
-            'top work 2008 ' + DIR + '/simple/ambiguous/test.syn.vhd',
-        ]) + '\n')
+        self.assertEqual(out.splitlines(keepends=True), _lines(
+            'top work 2008 ' + _AMBIG + 'test.syn.vhd',
+        ))
 
     def test_component_circle(self):
         """Test recursive instantiation using components"""
-        code, out, _ = run_vhdeps('dump', '-i', DIR + '/complex/component-circle')
+        code, out, _ = run_vhdeps('dump', '-i', _COMP_CIRCLE)
         self.assertEqual(code, 0)
-        self.assertEqual(out, '\n'.join([
-            'dep work 2008 ' + DIR + '/complex/component-circle/a.vhd',
-            'dep work 2008 ' + DIR + '/complex/component-circle/b.vhd',
-        ]) + '\n')
+        self.assertEqual(out.splitlines(keepends=True), _lines(
+            'dep work 2008 ' + _COMP_CIRCLE + 'a.vhd',
+            'dep work 2008 ' + _COMP_CIRCLE + 'b.vhd',
+        ))
 
     def test_component_in_inst(self):
         """Test component keyword in instantiation"""
-        code, out, _ = run_vhdeps('dump', '-i', DIR + '/complex/component-in-inst')
+        code, out, _ = run_vhdeps('dump', '-i', _COMP_IN_INST)
         self.assertEqual(code, 0)
-        self.assertEqual(out, '\n'.join([
-            'top work 2008 ' + DIR + '/complex/component-in-inst/a.vhd',
-            'dep work 2008 ' + DIR + '/complex/component-in-inst/b.vhd',
-        ]) + '\n')
+        self.assertEqual(out.splitlines(keepends=True), _lines(
+            'top work 2008 ' + _COMP_IN_INST + 'a.vhd',
+            'dep work 2008 ' + _COMP_IN_INST + 'b.vhd',
+        ))
 
     def test_entity_circle(self):
         """Test the error message for a true circular dependency"""
         code, _, err = run_vhdeps('dump', '-i', DIR + '/complex/entity-circle')
         self.assertEqual(code, 1)
-        self.assertTrue('ResolutionError: circular dependency:' in err)
+        self.assertIn('ResolutionError: circular dependency:', err)
 
     def test_multi_unit_circle(self):
         """Test circular dependencies caused by multiple design units per
         file"""
         code, _, err = run_vhdeps('dump', '-i', DIR + '/complex/multi-unit-circle')
         self.assertEqual(code, 1)
-        self.assertTrue('ResolutionError: circular dependency:' in err)
+        self.assertIn('ResolutionError: circular dependency:', err)
 
     def test_multi_unit_design(self):
         """Test dependency analysis when multiple entities are defined per
         file"""
-        code, out, _ = run_vhdeps('dump', '-i', DIR + '/complex/multi-unit-design')
+        code, out, _ = run_vhdeps('dump', '-i', _MULTI_UNIT)
         self.assertEqual(code, 0)
-        self.assertEqual(out, '\n'.join([
-            'dep work 2008 ' + DIR + '/complex/multi-unit-design/ab.vhd',
-            'dep work 2008 ' + DIR + '/complex/multi-unit-design/cd.vhd',
-            'top work 2008 ' + DIR + '/complex/multi-unit-design/test_tc.vhd',
-        ]) + '\n')
+        self.assertEqual(out.splitlines(keepends=True), _lines(
+            'dep work 2008 ' + _MULTI_UNIT + 'ab.vhd',
+            'dep work 2008 ' + _MULTI_UNIT + 'cd.vhd',
+            'top work 2008 ' + _MULTI_UNIT + 'test_tc.vhd',
+        ))
 
     def test_multi_tc_per_file(self):
         """Test the dump backend with multiple test cases per file"""
         code, out, _ = run_vhdeps('dump', '-i', DIR + '/complex/multi-tc-per-file')
         self.assertEqual(code, 0)
-        self.assertEqual(out, '\n'.join([
+        self.assertEqual(out.splitlines(keepends=True), _lines(
             'top work 2008 ' + DIR + '/complex/multi-tc-per-file/test_tc.vhd',
-        ]) + '\n')
+        ))
 
     def test_vhlib_default(self):
         """Test the dependency analyzer with vhlib, default filters"""
-        #pylint: disable=C0301
         self.maxDiff = None #pylint: disable=C0103
-        code, out, _ = run_vhdeps('dump', '-i', DIR + '/complex/vhlib')
-        self.assertEqual(code, 0)
-        self.assertEqual(out, '\n'.join([
-            'dep work 2008 ' + DIR + '/complex/vhlib/sim/TestCase_pkg.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/sim/SimDataComms_pkg.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/sim/SimDataComms_tc.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/model/StreamMonitor_pkg.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/model/StreamSource_pkg.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/model/StreamSink_pkg.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamArb/StreamArb_tv.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/Stream_pkg.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/sim/ClockGen_pkg.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamArb/StreamArb_tb.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamArb/StreamArb_Fixed_tc.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamArb/StreamArb_RoundRobin_tc.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamArb/StreamArb_RRSticky_tc.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/StreamArb.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamBuffer/StreamBuffer_tv.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamBuffer/StreamBuffer_tb.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamBuffer/StreamBuffer_0_tc.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamBuffer/StreamBuffer_200_tc.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamBuffer/StreamBuffer_2_tc.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamBuffer/StreamBuffer_4_tc.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamBuffer/StreamBuffer_6_tc.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/util/UtilInt_pkg.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamElementCounter/StreamElementCounter_tv.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamElementCounter/StreamElementCounter_tb.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamElementCounter/StreamElementCounter_16_5_32_9_tc.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamElementCounter/StreamElementCounter_8_3_63_6_tc.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/StreamElementCounter.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamFIFO/StreamFIFO_tv.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamFIFO/StreamFIFO_tb.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamFIFO/StreamFIFO_Increase_tc.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamFIFO/StreamFIFO_Reduce_tc.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamFIFO/StreamFIFO_Same_tc.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamGearbox/StreamGearbox_tv.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamGearbox/StreamGearbox_tb.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamGearbox/StreamGearbox_2_2_8_3_tc.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamGearbox/StreamGearbox_32_5_16_4_tc.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamGearbox/StreamGearbox_5_4_3_2_tc.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamGearbox/StreamGearbox_8_4_8_3_tc.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/StreamGearbox.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/StreamGearboxParallelizer.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/StreamGearboxSerializer.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/StreamNormalizer.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamNormalizer/StreamNormalizer_tb.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamNormalizer/StreamNormalizer_tc.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/util/UtilMisc_pkg.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/StreamPipelineBarrel.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamPipelineBarrel/StreamPipelineBarrel_tb.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamPipelineBarrel/StreamPipelineBarrel_tc.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamPipelineControl/StreamPipelineControl_tv.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamPipelineControl/StreamPipelineControl_tb.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamPipelineControl/StreamPipelineControl_20_3_t_tc.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamPipelineControl/StreamPipelineControl_5_1_f_tc.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/StreamPrefixSum.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamPrefixSum/StreamPrefixSum_tb.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamPrefixSum/StreamPrefixSum_tc.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamPRNG/StreamPRNG_tv.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamPRNG/StreamPRNG_tb.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamPRNG/StreamPRNG_12_tc.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamPRNG/StreamPRNG_8_tc.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/StreamPRNG.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamReshaper/StreamReshaperCtrl_tv.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamReshaper/StreamReshaperCtrl_tb.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamReshaper/StreamReshaperCtrl_1_1_7_3_tc.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamReshaper/StreamReshaperCtrl_4_3_4_3_tc.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamReshaper/StreamReshaperCtrl_8_3_4_2_tc.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamReshaper/StreamReshaperLast_tv.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamReshaper/StreamReshaperLast_tb.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamReshaper/StreamReshaperLast_1_1_7_3_tc.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamReshaper/StreamReshaperLast_4_3_4_3_tc.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamReshaper/StreamReshaperLast_8_3_4_2_tc.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/StreamPipelineControl.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/StreamFIFOCounter.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/util/UtilRam_pkg.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/StreamFIFO.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/StreamBuffer.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/StreamReshaper.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamSink/StreamSink_tc.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/StreamSlice.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamSlice/StreamSlice_tb.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamSlice/StreamSlice_tc.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamSource/StreamSource_tc.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/model/StreamSource_mdl.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/model/StreamMonitor_mdl.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/model/StreamSink_mdl.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/StreamSync.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/sim/ClockGen_mdl.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamSync/StreamSync_tb.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamSync/StreamSync_tc.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/util/UtilRam1R1W.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/util/UtilConv_pkg.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/util/UtilStr_pkg.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/util/UtilMem64_pkg.vhd',
-        ]) + '\n')
+        code, out, _ = _run_dump('-i', _VHLIB)
+        self.assertEqual(code, 0)
+        self.assertEqual(out.splitlines(keepends=True), _vhlib_dump('vhlib'))
 
     def test_vhlib_93_desired(self):
         """Test the dependency analyzer with vhlib, preferring v93"""
-        #pylint: disable=C0301
         self.maxDiff = None #pylint: disable=C0103
-        code, out, _ = run_vhdeps('dump', '-i', DIR + '/complex/vhlib', '-d', '93')
-        self.assertEqual(code, 0)
-        self.assertEqual(out, '\n'.join([
-            'dep work 2008 ' + DIR + '/complex/vhlib/sim/TestCase_pkg.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/sim/SimDataComms_pkg.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/sim/SimDataComms_tc.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/model/StreamMonitor_pkg.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/model/StreamSource_pkg.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/model/StreamSink_pkg.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamArb/StreamArb_tv.sim.08.vhd',
-            'dep work 1993 ' + DIR + '/complex/vhlib/stream/Stream_pkg.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/sim/ClockGen_pkg.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamArb/StreamArb_tb.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamArb/StreamArb_Fixed_tc.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamArb/StreamArb_RoundRobin_tc.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamArb/StreamArb_RRSticky_tc.sim.08.vhd',
-            'dep work 1993 ' + DIR + '/complex/vhlib/stream/StreamArb.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamBuffer/StreamBuffer_tv.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamBuffer/StreamBuffer_tb.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamBuffer/StreamBuffer_0_tc.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamBuffer/StreamBuffer_200_tc.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamBuffer/StreamBuffer_2_tc.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamBuffer/StreamBuffer_4_tc.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamBuffer/StreamBuffer_6_tc.sim.08.vhd',
-            'dep work 1993 ' + DIR + '/complex/vhlib/util/UtilInt_pkg.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamElementCounter/StreamElementCounter_tv.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamElementCounter/StreamElementCounter_tb.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamElementCounter/StreamElementCounter_16_5_32_9_tc.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamElementCounter/StreamElementCounter_8_3_63_6_tc.sim.08.vhd',
-            'dep work 1993 ' + DIR + '/complex/vhlib/stream/StreamElementCounter.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamFIFO/StreamFIFO_tv.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamFIFO/StreamFIFO_tb.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamFIFO/StreamFIFO_Increase_tc.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamFIFO/StreamFIFO_Reduce_tc.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamFIFO/StreamFIFO_Same_tc.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamGearbox/StreamGearbox_tv.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamGearbox/StreamGearbox_tb.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamGearbox/StreamGearbox_2_2_8_3_tc.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamGearbox/StreamGearbox_32_5_16_4_tc.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamGearbox/StreamGearbox_5_4_3_2_tc.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamGearbox/StreamGearbox_8_4_8_3_tc.sim.08.vhd',
-            'dep work 1993 ' + DIR + '/complex/vhlib/stream/StreamGearbox.vhd',
-            'dep work 1993 ' + DIR + '/complex/vhlib/stream/StreamGearboxParallelizer.vhd',
-            'dep work 1993 ' + DIR + '/complex/vhlib/stream/StreamGearboxSerializer.vhd',
-            'dep work 1993 ' + DIR + '/complex/vhlib/stream/StreamNormalizer.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamNormalizer/StreamNormalizer_tb.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamNormalizer/StreamNormalizer_tc.sim.08.vhd',
-            'dep work 1993 ' + DIR + '/complex/vhlib/util/UtilMisc_pkg.vhd',
-            'dep work 1993 ' + DIR + '/complex/vhlib/stream/StreamPipelineBarrel.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamPipelineBarrel/StreamPipelineBarrel_tb.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamPipelineBarrel/StreamPipelineBarrel_tc.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamPipelineControl/StreamPipelineControl_tv.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamPipelineControl/StreamPipelineControl_tb.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamPipelineControl/StreamPipelineControl_20_3_t_tc.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamPipelineControl/StreamPipelineControl_5_1_f_tc.sim.08.vhd',
-            'dep work 1993 ' + DIR + '/complex/vhlib/stream/StreamPrefixSum.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamPrefixSum/StreamPrefixSum_tb.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamPrefixSum/StreamPrefixSum_tc.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamPRNG/StreamPRNG_tv.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamPRNG/StreamPRNG_tb.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamPRNG/StreamPRNG_12_tc.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamPRNG/StreamPRNG_8_tc.sim.08.vhd',
-            'dep work 1993 ' + DIR + '/complex/vhlib/stream/StreamPRNG.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamReshaper/StreamReshaperCtrl_tv.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamReshaper/StreamReshaperCtrl_tb.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamReshaper/StreamReshaperCtrl_1_1_7_3_tc.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamReshaper/StreamReshaperCtrl_4_3_4_3_tc.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamReshaper/StreamReshaperCtrl_8_3_4_2_tc.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamReshaper/StreamReshaperLast_tv.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamReshaper/StreamReshaperLast_tb.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamReshaper/StreamReshaperLast_1_1_7_3_tc.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamReshaper/StreamReshaperLast_4_3_4_3_tc.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamReshaper/StreamReshaperLast_8_3_4_2_tc.sim.08.vhd',
-            'dep work 1993 ' + DIR + '/complex/vhlib/stream/StreamPipelineControl.vhd',
-            'dep work 1993 ' + DIR + '/complex/vhlib/stream/StreamFIFOCounter.vhd',
-            'dep work 1993 ' + DIR + '/complex/vhlib/util/UtilRam_pkg.vhd',
-            'dep work 1993 ' + DIR + '/complex/vhlib/stream/StreamFIFO.vhd',
-            'dep work 1993 ' + DIR + '/complex/vhlib/stream/StreamBuffer.vhd',
-            'dep work 1993 ' + DIR + '/complex/vhlib/stream/StreamReshaper.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamSink/StreamSink_tc.sim.08.vhd',
-            'dep work 1993 ' + DIR + '/complex/vhlib/stream/StreamSlice.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamSlice/StreamSlice_tb.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamSlice/StreamSlice_tc.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamSource/StreamSource_tc.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/model/StreamSource_mdl.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/model/StreamMonitor_mdl.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/model/StreamSink_mdl.sim.08.vhd',
-            'dep work 1993 ' + DIR + '/complex/vhlib/stream/StreamSync.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/sim/ClockGen_mdl.sim.08.vhd',
-            'dep work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamSync/StreamSync_tb.sim.08.vhd',
-            'top work 2008 ' + DIR + '/complex/vhlib/stream/test/StreamSync/StreamSync_tc.sim.08.vhd',
-            'dep work 1993 ' + DIR + '/complex/vhlib/util/UtilRam1R1W.vhd',
-            'dep work 1993 ' + DIR + '/complex/vhlib/util/UtilConv_pkg.vhd',
-            'dep work 1993 ' + DIR + '/complex/vhlib/util/UtilStr_pkg.vhd',
-            'dep work 1993 ' + DIR + '/complex/vhlib/util/UtilMem64_pkg.vhd',
-        ]) + '\n')
+        code, out, _ = _run_dump('-i', _VHLIB, '-d', '93')
+        self.assertEqual(code, 0)
+        self.assertEqual(out.splitlines(keepends=True), _vhlib_dump('vhlib', 1))
 
     def test_vhlib_93_required(self):
         """Test the dependency analyzer with vhlib, synthesis only"""
         self.maxDiff = None
-        code, out, _ = run_vhdeps('dump', '-i', DIR + '/complex/vhlib', '-v', '93')
-        self.assertEqual(code, 0)
-        self.assertEqual(out, '\n'.join([
-            'top work 1993 ' + DIR + '/complex/vhlib/stream/StreamArb.vhd',
-            'dep work 1993 ' + DIR + '/complex/vhlib/util/UtilInt_pkg.vhd',
-            'dep work 1993 ' + DIR + '/complex/vhlib/stream/Stream_pkg.vhd',
-            'top work 1993 ' + DIR + '/complex/vhlib/stream/StreamElementCounter.vhd',
-            'top work 1993 ' + DIR + '/complex/vhlib/stream/StreamGearbox.vhd',
-            'dep work 1993 ' + DIR + '/complex/vhlib/stream/StreamGearboxParallelizer.vhd',
-            'dep work 1993 ' + DIR + '/complex/vhlib/stream/StreamGearboxSerializer.vhd',
-            'top work 1993 ' + DIR + '/complex/vhlib/stream/StreamNormalizer.vhd',
-            'top work 1993 ' + DIR + '/complex/vhlib/stream/StreamPrefixSum.vhd',
-            'top work 1993 ' + DIR + '/complex/vhlib/stream/StreamPRNG.vhd',
-            'dep work 1993 ' + DIR + '/complex/vhlib/stream/StreamPipelineControl.vhd',
-            'dep work 1993 ' + DIR + '/complex/vhlib/util/UtilMisc_pkg.vhd',
-            'dep work 1993 ' + DIR + '/complex/vhlib/stream/StreamPipelineBarrel.vhd',
-            'dep work 1993 ' + DIR + '/complex/vhlib/stream/StreamFIFOCounter.vhd',
-            'dep work 1993 ' + DIR + '/complex/vhlib/util/UtilRam_pkg.vhd',
-            'dep work 1993 ' + DIR + '/complex/vhlib/stream/StreamFIFO.vhd',
-            'dep work 1993 ' + DIR + '/complex/vhlib/stream/StreamBuffer.vhd',
-            'top work 1993 ' + DIR + '/complex/vhlib/stream/StreamReshaper.vhd',
-            'dep work 1993 ' + DIR + '/complex/vhlib/stream/StreamSlice.vhd',
-            'top work 1993 ' + DIR + '/complex/vhlib/stream/StreamSync.vhd',
-            'dep work 1993 ' + DIR + '/complex/vhlib/util/UtilRam1R1W.vhd',
-            'dep work 1993 ' + DIR + '/complex/vhlib/util/UtilConv_pkg.vhd',
-            'dep work 1993 ' + DIR + '/complex/vhlib/util/UtilStr_pkg.vhd',
-            'dep work 1993 ' + DIR + '/complex/vhlib/util/UtilMem64_pkg.vhd',
-        ]) + '\n')
+        code, out, _ = _run_dump('-i', _VHLIB, '-v', '93')
+        self.assertEqual(code, 0)
+        self.assertEqual(out.splitlines(keepends=True), _vhlib_dump('vhlib-93-required'))
+
+    def test_parse_jobs(self):
+        """Test that parsing in parallel yields the same compile order"""
+        code, expected, _ = _run_dump('-i', _VHLIB)
+        self.assertEqual(code, 0)
+        vhdl.clear_parse_cache()
+        code, out, _ = run_vhdeps('dump', '-i', _VHLIB, '--parse-jobs', '4')
+        self.assertEqual(code, 0)
+        self.assertEqual(out, expected)
+
+    def test_cache_dir(self):
+        """Test the on-disk parse cache"""
+        code, expected, _ = _run_dump('-i', _VHLIB)
+        self.assertEqual(code, 0)
+        tempdir = os.path.join(self.tempdir, 'cache')
+
+        # Populate the cache.
+        vhdl.clear_parse_cache()
+        code, out, _ = run_vhdeps(
+            'dump', '-i', _VHLIB, '--cache-dir', tempdir)
+        self.assertEqual(code, 0)
+        self.assertEqual(out, expected)
+
+        # Read it back without the in-memory cache getting in the way.
+        # Unchanged files should not even be read. The private reader and
+        # parser are spied upon, as there is no public way to observe them.
+        vhdl.clear_parse_cache()
+        read_vhd = vhdl._read_vhd #pylint: disable=W0212
+        with patch('vhdeps.vhdl._read_vhd', side_effect=read_vhd) as read:
+            code, out, _ = run_vhdeps(
+                'dump', '-i', _VHLIB, '--cache-dir', tempdir)
+        self.assertEqual(code, 0)
+        self.assertEqual(out, expected)
+        self.assertEqual(read.call_count, 0)
+
+        # Copies of the files are not in the filename index, so they are read,
+        # but not parsed again.
+        copy = os.path.realpath(os.path.join(self.tempdir, 'vhlib'))
+        shutil.copytree(_VHLIB, copy, ignore=_ignore_non_vhdl)
+        vhdl.clear_parse_cache()
+        parse_contents = vhdl._parse_contents #pylint: disable=W0212
+        with patch('vhdeps.vhdl._parse_contents', side_effect=parse_contents) as parse:
+            code, out, _ = run_vhdeps(
+                'dump', '-i', copy, '--cache-dir', tempdir)
+        self.assertEqual(code, 0)
+        self.assertEqual(out.replace(copy, _VHLIB), expected)
+        self.assertEqual(parse.call_count, 0)
+
+        entries = [
+            os.path.join(dirpath, fname)
+            for dirpath, _, fnames in os.walk(tempdir)
+            for fname in fnames]
+        self.assertTrue(entries)
+
+        # Corrupt cache entries must be ignored.
+        for entry in entries:
+            with open(entry, 'wb') as fildes:
+                fildes.write(b'garbage')
+        vhdl.clear_parse_cache()
+        code, out, _ = run_vhdeps(
+            'dump', '-i', _VHLIB, '--cache-dir', tempdir)
+        self.assertEqual(code, 0)
+        self.assertEqual(out, expected)
@@ -4,13 +4,23 @@ from unittest import TestCase, skipIf
 from unittest.mock import patch
 import re
 import os
+import shutil
 import tempfile
-from plumbum import local
-from .common import run_vhdeps, MockMissingImport
+from plumbum import local, FG
+from vhdeps.targets import ghdl as ghdl_target
+from .common import run_vhdeps, prepend_path, MockMissingImport
 
 DIR = os.path.realpath(os.path.dirname(__file__))
 
-def ghdl_installed():
+# Paths to the test case directories in tests/simple used by these tests.
+_SIMPLE = {
+    name: os.path.join(DIR, 'simple', name)
+    for name in [
+        'all-good', 'failure', 'partial-failure', 'timeout', 'elab-error', 'parse-error',
+        'default-timeout-success', 'default-timeout-too-short', 'multiple-ok',
+        'multi-version']}
+
+def _ghdl_installed():
     """Returns whether GHDL is installed."""
     try:
         from plumbum.cmd import ghdl #pylint: disable=W0611,C0415
@@ -18,7 +28,7 @@ def ghdl_installed():
     except ImportError:
         return False
 
-def coverage_supported():
+def _coverage_supported():
     """Returns whether all the dependencies for producing code coverage with
     GHDL are met."""
     try:
@@ -28,125 +38,124 @@ def coverage_supported():
     except ImportError:
         return False
 
-@skipIf(not ghdl_installed(), 'missing ghdl')
-class TestGhdlSimple(TestCase):
+# Whether the tools needed by the tests are available. These are only probed
+# once, rather than for every test they are used to skip.
+GHDL_INSTALLED = _ghdl_installed()
+COVERAGE_SUPPORTED = _coverage_supported()
+
+class _GhdlTestCase(TestCase):
+    """Base class for the GHDL test cases."""
+
+    def assertAllIn(self, needles, haystack): #pylint: disable=C0103
+        """Asserts that all the given needles occur in haystack, reporting all
+        the missing ones at once."""
+        missing = [needle for needle in needles if needle not in haystack]
+        self.assertFalse(missing, 'missing: %r' % missing)
+
+@skipIf(not GHDL_INSTALLED, 'missing ghdl')
+class TestGhdlSimple(_GhdlTestCase):
     """Basic tests for the GHDL backend, testing whether the test suite results
     are returned properly."""
 
-    def test_all_good(self):
-        """Test that a single passing test case results in success (GHDL)"""
-        code, out, _ = run_vhdeps('ghdl', '-i', DIR+'/simple/all-good')
-        self.assertEqual(code, 0)
-        self.assertTrue('working!' in out)
-        self.assertTrue('PASSED  work.test_tc' in out)
-        self.assertTrue('Test suite PASSED' in out)
+    def test_results(self):
+        """Test that test suite results are reported properly (GHDL)"""
+        cases = [
+            # (description, directory, exit code, stdout needles, stderr needles)
+            ('single passing test case', 'all-good', 0,
+             ['working!', 'PASSED  work.test_tc', 'Test suite PASSED'], []),
+            ('single failing test case', 'failure', 1,
+             ['uh oh!', 'FAILED  work.test_tc', 'Test suite FAILED'], []),
+            ('passing and failing test case', 'partial-failure', 1,
+             ['working!', 'uh oh!', 'FAILED  work.fail_tc', 'PASSED  work.pass_tc',
+              'Test suite FAILED'], []),
+            ('timeout', 'timeout', 1,
+             ['TIMEOUT work.test_tc', 'Test suite FAILED'], []),
+            ('elaboration error', 'elab-error', 1,
+             ['error during elaboration', 'Test suite FAILED'], []),
+            ('default timeout (pass)', 'default-timeout-success', 0,
+             ['working!', 'PASSED  work.test_tc', 'Test suite PASSED'],
+             ['Warning: no simulation timeout specified for work.test_tc']),
+            ('default timeout (fail)', 'default-timeout-too-short', 1,
+             ['TIMEOUT work.test_tc', 'Test suite FAILED'],
+             ['Warning: no simulation timeout specified for work.test_tc']),
+        ]
+        for description, dirname, exp_code, exp_out, exp_err in cases:
+            with self.subTest(description):
+                code, out, err = run_vhdeps('ghdl', '-i', _SIMPLE[dirname])
+                self.assertEqual(code, exp_code)
+                self.assertAllIn(exp_out, out)
+                self.assertAllIn(exp_err, err)
 
     def test_multiple_per_file(self):
         """Test that multiple test cases can exist in one file (GHDL)"""
         code, out, _ = run_vhdeps('ghdl', '-i', DIR+'/complex/multi-tc-per-file')
         self.assertEqual(code, 0)
-        self.assertTrue('working!' in out)
-        self.assertTrue('PASSED  work.foo_tc' in out)
-        self.assertTrue('PASSED  work.bar_tc' in out)
+        self.assertAllIn(
+            ['working!', 'PASSED  work.foo_tc', 'PASSED  work.bar_tc', 'Test suite PASSED'], out)
         self.assertFalse('baz' in out)
-        self.assertTrue('Test suite PASSED' in out)
 
-    def test_failure(self):
-        """Test that a single failing test case results in failure (GHDL)"""
-        code, out, _ = run_vhdeps('ghdl', '-i', DIR+'/simple/failure')
-        self.assertEqual(code, 1)
-        self.assertTrue('uh oh!' in out)
-        self.assertTrue('FAILED  work.test_tc' in out)
-        self.assertTrue('Test suite FAILED' in out)
-
-    def test_partial_failure(self):
-        """Test that a suite with both a passing and a failing test case
-        results in failure (GHDL)"""
-        code, out, _ = run_vhdeps('ghdl', '-i', DIR+'/simple/partial-failure')
-        self.assertEqual(code, 1)
-        self.assertTrue('working!' in out)
-        self.assertTrue('uh oh!' in out)
-        self.assertTrue('FAILED  work.fail_tc' in out)
-        self.assertTrue('PASSED  work.pass_tc' in out)
-        self.assertTrue('Test suite FAILED' in out)
-
-    def test_timeout(self):
-        """Test that a timeout results in failure (GHDL)"""
-        code, out, _ = run_vhdeps('ghdl', '-i', DIR+'/simple/timeout')
-        self.assertEqual(code, 1)
-        self.assertTrue('TIMEOUT work.test_tc' in out)
-        self.assertTrue('Test suite FAILED' in out)
+    def test_parse_error(self):
+        """Test that a compile error results in failure (GHDL)"""
+        code, out, _ = run_vhdeps('ghdl', '-i', _SIMPLE['parse-error'])
+        self.assertEqual(code, 2)
+        self.assertIn('Analysis failed!', out)
 
-    def test_error(self):
-        """Test that an elaboration error results in failure (GHDL)"""
-        code, out, _ = run_vhdeps('ghdl', '-i', DIR+'/simple/elab-error')
-        self.assertEqual(code, 1)
-        self.assertTrue('error during elaboration' in out)
-        self.assertTrue('Test suite FAILED' in out)
+class _ScratchDirTestCase(_GhdlTestCase):
+    """Base class for test cases that need scratch directories. All tests in
+    a class share a single temporary directory, which is only created and
+    removed once; each test gets its own subdirectory within it."""
 
-    def parse_error(self):
-        """Test that a compile error results in failure (GHDL)"""
-        code, out, _ = run_vhdeps('ghdl', '-i', DIR+'/simple/parse-error')
-        self.assertEqual(code, 1)
-        self.assertTrue('error during elaboration' in out)
-        self.assertTrue('Test suite FAILED' in out)
+    @classmethod
+    def setUpClass(cls):
+        cls._tempdir = tempfile.mkdtemp()
 
-    def test_default_timeout_success(self):
-        """Test the default timeout in GHDL (pass)"""
-        code, out, err = run_vhdeps('ghdl', '-i', DIR+'/simple/default-timeout-success')
-        self.assertEqual(code, 0)
-        self.assertTrue('Warning: no simulation timeout specified for work.test_tc' in err)
-        self.assertTrue('working!' in out)
-        self.assertTrue('PASSED  work.test_tc' in out)
-        self.assertTrue('Test suite PASSED' in out)
-
-    def test_default_timeout_too_short(self):
-        """Test the default timeout in GHDL (fail)"""
-        code, out, err = run_vhdeps('ghdl', '-i', DIR+'/simple/default-timeout-too-short')
-        self.assertEqual(code, 1)
-        self.assertTrue('Warning: no simulation timeout specified for work.test_tc' in err)
-        self.assertTrue('TIMEOUT work.test_tc' in out)
-        self.assertTrue('Test suite FAILED' in out)
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls._tempdir)
 
-class TestGhdlSpecific(TestCase):
+    def scratch_dir(self):
+        """Creates and returns an empty scratch directory for the current
+        test."""
+        dirname = os.path.join(self._tempdir, self._testMethodName)
+        os.mkdir(dirname)
+        return dirname
+
+class TestGhdlSpecific(_ScratchDirTestCase):
     """Tests more advanced features of the GHDL backend that are
     GHDL-specific."""
 
     def test_multi_version(self):
         """Test the error message for mixing VHDL versions with GHDL"""
-        with local.env(PATH=DIR+'/ghdl/fake-ghdl:' + local.env['PATH']):
-            code, _, err = run_vhdeps('ghdl', '-i', DIR+'/simple/multi-version')
+        with prepend_path(DIR+'/ghdl/fake-ghdl'):
+            code, _, err = run_vhdeps('ghdl', '-i', _SIMPLE['multi-version'])
         self.assertEqual(code, 1)
         self.assertTrue('GHDL does not support mixing VHDL versions.' in err)
 
     def test_unknown_version(self):
         """Test the error message for VHDL versions unknown to GHDL"""
-        with local.env(PATH=DIR+'/ghdl/fake-ghdl:' + local.env['PATH']):
+        with prepend_path(DIR+'/ghdl/fake-ghdl'):
             code, _, err = run_vhdeps('ghdl', '-i', DIR+'/ghdl/unknown-version')
         self.assertEqual(code, 1)
         self.assertTrue('GHDL supports only the following versions:' in err)
 
     def test_analyze_error(self):
         """Test the error message for when GHDL analysis fails"""
-        with local.env(PATH=DIR+'/ghdl/fake-analyze-error:' + local.env['PATH']):
-            code, out, _ = run_vhdeps('ghdl', '-i', DIR+'/simple/all-good')
+        with prepend_path(DIR+'/ghdl/fake-analyze-error'):
+            code, out, _ = run_vhdeps('ghdl', '-i', _SIMPLE['all-good'])
         self.assertEqual(code, 2)
-        self.assertTrue('dummy ghdl: error' in out)
-        self.assertTrue('Analysis failed!' in out)
+        self.assertAllIn(['dummy ghdl: error', 'Analysis failed!'], out)
 
     def test_elaborate_error(self):
         """Test the error message for when GHDL elaboration fails"""
-        with local.env(PATH=DIR+'/ghdl/fake-elaborate-error:' + local.env['PATH']):
-            code, out, _ = run_vhdeps('ghdl', '-i', DIR+'/simple/all-good')
+        with prepend_path(DIR+'/ghdl/fake-elaborate-error'):
+            code, out, _ = run_vhdeps('ghdl', '-i', _SIMPLE['all-good'])
         self.assertEqual(code, 1)
-        self.assertTrue('dummy ghdl: error' in out)
-        self.assertTrue('ERROR   work.test_tc' in out)
-        self.assertTrue('Test suite FAILED' in out)
+        self.assertAllIn(['dummy ghdl: error', 'ERROR   work.test_tc', 'Test suite FAILED'], out)
 
     def test_no_wc(self):
         """Test the error message for when GHDL does not understand -Wc"""
-        with local.env(PATH=DIR+'/ghdl/fake-wc-error:' + local.env['PATH']):
-            code, out, _ = run_vhdeps('ghdl', '-i', DIR+'/simple/all-good', '-c')
+        with prepend_path(DIR+'/ghdl/fake-wc-error'):
+            code, out, _ = run_vhdeps('ghdl', '-i', _SIMPLE['all-good'], '-c')
         self.assertEqual(code, 2)
         self.assertTrue('GHDL did not understand -Wc option! You need a version '
                         'of GHDL that was\ncompiled with the GCC backend' in out)
@@ -154,126 +163,129 @@ class TestGhdlSpecific(TestCase):
     def test_no_ghdl(self):
         """Test the error message that is generated when ghdl is missing"""
         with local.env(PATH=''):
-            code, _, err = run_vhdeps('ghdl', '-i', DIR+'/simple/all-good')
+            code, _, err = run_vhdeps('ghdl', '-i', _SIMPLE['all-good'])
             self.assertEqual(code, 1)
             self.assertTrue('ghdl was not found.' in err)
 
     def test_no_plumbum(self):
         """Test the error message that is generated when plumbum is missing"""
         with MockMissingImport('plumbum'):
-            code, _, err = run_vhdeps('ghdl', '-i', DIR+'/simple/all-good')
+            code, _, err = run_vhdeps('ghdl', '-i', _SIMPLE['all-good'])
             self.assertEqual(code, 1)
             self.assertTrue('the GHDL backend requires plumbum to be installed' in err)
 
-    @skipIf(not ghdl_installed(), 'missing ghdl')
+    @skipIf(not GHDL_INSTALLED, 'missing ghdl')
     def test_no_tempdir(self):
         """Test the --no-tempdir flag for GHDL"""
-        with tempfile.TemporaryDirectory() as tempdir:
-            with local.cwd(tempdir):
-                code, _, _ = run_vhdeps('ghdl', '-i', DIR+'/simple/all-good', '--no-tempdir')
-            self.assertEqual(code, 0)
-            self.assertTrue('work-obj08.cf' in os.listdir(tempdir))
+        tempdir = self.scratch_dir()
+        with local.cwd(tempdir):
+            code, _, _ = run_vhdeps(
+                'ghdl', '-i', _SIMPLE['all-good'], '--no-tempdir', capture=False)
+        self.assertEqual(code, 0)
+        self.assertTrue('work-obj08.cf' in os.listdir(tempdir))
 
-    @skipIf(not ghdl_installed(), 'missing ghdl')
+    @skipIf(not GHDL_INSTALLED, 'missing ghdl')
     def test_workdir(self):
         """Test the workdir for the test case for GHDL"""
-        with tempfile.TemporaryDirectory() as tempdir:
-            local['cp'](DIR+'/complex/file-io/test_tc.vhd', tempdir)
-            with local.cwd(tempdir):
-                code, _, _ = run_vhdeps('ghdl')
-            self.assertEqual(code, 0)
-            self.assertEqual(sorted(os.listdir(tempdir)), ['output_file.txt', 'test_tc.vhd'])
-
-    @skipIf(not ghdl_installed(), 'missing ghdl')
+        tempdir = self.scratch_dir()
+        local['cp'](DIR+'/complex/file-io/test_tc.vhd', tempdir)
+        with local.cwd(tempdir):
+            code, _, _ = run_vhdeps('ghdl', capture=False)
+        self.assertEqual(code, 0)
+        self.assertEqual(sorted(os.listdir(tempdir)), ['output_file.txt', 'test_tc.vhd'])
+
+    @skipIf(not GHDL_INSTALLED, 'missing ghdl')
     def test_vcd_dir(self):
         """Test VCD output with GHDL"""
-        with tempfile.TemporaryDirectory() as tempdir:
-            with local.cwd(tempdir):
-                code, _, _ = run_vhdeps('ghdl', '-i', DIR+'/simple/all-good', '-w', 'wave')
-            self.assertEqual(code, 0)
-            self.assertTrue('work.test_tc.vcd' in os.listdir(tempdir + '/wave'))
-
-    @skipIf(not ghdl_installed(), 'missing ghdl')
+        tempdir = self.scratch_dir()
+        with local.cwd(tempdir):
+            code, _, _ = run_vhdeps(
+                'ghdl', '-i', _SIMPLE['all-good'], '-w', 'wave', capture=False)
+        self.assertEqual(code, 0)
+        self.assertTrue('work.test_tc.vcd' in os.listdir(tempdir + '/wave'))
+
+    def test_open_gtkwave(self):
+        """Test the gtkwave command line used to open a VCD file"""
+        with patch('plumbum.local') as plumbum_local:
+            ghdl_target._open_gtkwave('wave.vcd') #pylint: disable=W0212
+        plumbum_local.__getitem__.assert_called_once_with('gtkwave')
+        gtkwave = plumbum_local.__getitem__.return_value
+        gtkwave.__getitem__.assert_called_once_with('wave.vcd')
+        gtkwave.__getitem__.return_value.__and__.assert_called_once_with(FG)
+
+    @skipIf(not GHDL_INSTALLED, 'missing ghdl')
     def test_gtkwave_single_fail(self):
         """Test launching gtkwave for a single test case that fails"""
-        with tempfile.TemporaryDirectory() as tempdir:
-            with local.env(PATH=DIR+'/ghdl/fake-gtkwave:' + local.env['PATH'],
-                           GTKWAVE_CMD_LINE=tempdir+'/gtkwave'):
-                code, _, _ = run_vhdeps('ghdl', '-i', DIR+'/simple/failure', '--gui')
-            self.assertEqual(code, 1)
-            with open(tempdir+'/gtkwave', 'r') as fildes:
-                self.assertTrue('work.test_tc.vcd' in fildes.read())
+        with patch('vhdeps.targets.ghdl._open_gtkwave') as open_gtkwave:
+            code, _, _ = run_vhdeps('ghdl', '-i', _SIMPLE['failure'], '--gui', capture=False)
+        self.assertEqual(code, 1)
+        open_gtkwave.assert_called_once()
+        self.assertTrue('work.test_tc.vcd' in open_gtkwave.call_args[0][0])
 
-    @skipIf(not ghdl_installed(), 'missing ghdl')
+    @skipIf(not GHDL_INSTALLED, 'missing ghdl')
     def test_gtkwave_single_success(self):
         """Test launching gtkwave for a single test case that passes"""
-        with tempfile.TemporaryDirectory() as tempdir:
-            with local.env(PATH=DIR+'/ghdl/fake-gtkwave:' + local.env['PATH'],
-                           GTKWAVE_CMD_LINE=tempdir+'/gtkwave'):
-                code, _, _ = run_vhdeps('ghdl', '-i', DIR+'/simple/all-good', '--gui')
-            self.assertEqual(code, 0)
-            with open(tempdir+'/gtkwave', 'r') as fildes:
-                self.assertTrue('work.test_tc.vcd' in fildes.read())
-
-    @skipIf(not ghdl_installed(), 'missing ghdl')
+        with patch('vhdeps.targets.ghdl._open_gtkwave') as open_gtkwave:
+            code, _, _ = run_vhdeps(
+                'ghdl', '-i', _SIMPLE['all-good'], '--gui', capture=False)
+        self.assertEqual(code, 0)
+        open_gtkwave.assert_called_once()
+        self.assertTrue('work.test_tc.vcd' in open_gtkwave.call_args[0][0])
+
+    @skipIf(not GHDL_INSTALLED, 'missing ghdl')
     def test_gtkwave_multi_fail(self):
         """Test launching gtkwave for a test suite with a failure"""
-        with tempfile.TemporaryDirectory() as tempdir:
-            with local.env(PATH=DIR+'/ghdl/fake-gtkwave:' + local.env['PATH'],
-                           GTKWAVE_CMD_LINE=tempdir+'/gtkwave'):
-                code, _, _ = run_vhdeps('ghdl', '-i', DIR+'/simple/partial-failure', '--gui')
-            self.assertEqual(code, 1)
-            with open(tempdir+'/gtkwave', 'r') as fildes:
-                self.assertTrue('work.fail_tc.vcd' in fildes.read())
+        with patch('vhdeps.targets.ghdl._open_gtkwave') as open_gtkwave:
+            code, _, _ = run_vhdeps(
+                'ghdl', '-i', _SIMPLE['partial-failure'], '--gui', capture=False)
+        self.assertEqual(code, 1)
+        open_gtkwave.assert_called_once()
+        self.assertTrue('work.fail_tc.vcd' in open_gtkwave.call_args[0][0])
 
-    @skipIf(not ghdl_installed(), 'missing ghdl')
+    @skipIf(not GHDL_INSTALLED, 'missing ghdl')
     def test_gtkwave_multi_success(self):
         """Test NOT launching gtkwave for a test suite that passes"""
-        with tempfile.TemporaryDirectory() as tempdir:
-            with local.env(PATH=DIR+'/ghdl/fake-gtkwave:' + local.env['PATH'],
-                           GTKWAVE_CMD_LINE=tempdir+'/gtkwave'):
-                code, out, _ = run_vhdeps('ghdl', '-i', DIR+'/simple/multiple-ok', '--gui')
-            self.assertEqual(code, 0)
-            self.assertTrue('No data available to open gtkwave for.' in out)
-            self.assertFalse(os.path.isfile(tempdir+'/gtkwave'))
-
-    @skipIf(not ghdl_installed(), 'missing ghdl')
+        with patch('vhdeps.targets.ghdl._open_gtkwave') as open_gtkwave:
+            code, out, _ = run_vhdeps('ghdl', '-i', _SIMPLE['multiple-ok'], '--gui')
+        self.assertEqual(code, 0)
+        self.assertTrue('No data available to open gtkwave for.' in out)
+        open_gtkwave.assert_not_called()
+
+    @skipIf(not GHDL_INSTALLED, 'missing ghdl')
     def test_parallel_failure(self):
         """Test GHDL parallel elab/execute with a failing test suite"""
-        code, out, _ = run_vhdeps('ghdl', '-i', DIR+'/simple/partial-failure', '-j')
+        code, out, _ = run_vhdeps('ghdl', '-i', _SIMPLE['partial-failure'], '-j')
         self.assertEqual(code, 1)
-        self.assertTrue('working!' in out)
-        self.assertTrue('uh oh!' in out)
-        self.assertTrue('FAILED  work.fail_tc' in out)
-        self.assertTrue('PASSED  work.pass_tc' in out)
-        self.assertTrue('Test suite FAILED' in out)
+        self.assertAllIn(
+            ['working!', 'uh oh!', 'FAILED  work.fail_tc', 'PASSED  work.pass_tc',
+             'Test suite FAILED'], out)
 
-    @skipIf(not ghdl_installed(), 'missing ghdl')
+    @skipIf(not GHDL_INSTALLED, 'missing ghdl')
     def test_parallel_success(self):
         """Test GHDL parallel elab/execute with a passing test suite"""
-        code, out, _ = run_vhdeps('ghdl', '-i', DIR+'/simple/multiple-ok', '-j')
+        code, out, _ = run_vhdeps('ghdl', '-i', _SIMPLE['multiple-ok'], '-j')
         self.assertEqual(code, 0)
-        self.assertTrue('working!' in out)
-        self.assertTrue('PASSED  work.foo_tc' in out)
-        self.assertTrue('PASSED  work.bar_tc' in out)
-        self.assertTrue('Test suite PASSED' in out)
+        self.assertAllIn(
+            ['working!', 'PASSED  work.foo_tc', 'PASSED  work.bar_tc', 'Test suite PASSED'], out)
 
-    @skipIf(not ghdl_installed(), 'missing ghdl')
     def test_parallel_interrupt(self):
         """Test GHDL parallel elab/execute interrupted with ctrl+C"""
-        with patch('queue.Queue.join', side_effect=KeyboardInterrupt):
-            code, _, _ = run_vhdeps('ghdl', '-i', DIR+'/simple/multiple-ok', '-j')
-            self.assertEqual(code, 1)
+        with prepend_path(DIR+'/ghdl/fake-ghdl'):
+            with patch('vhdeps.targets.ghdl._join_workers',
+                       side_effect=KeyboardInterrupt) as join_workers:
+                code, _, _ = run_vhdeps('ghdl', '-i', _SIMPLE['multiple-ok'], '-j')
+        self.assertEqual(code, 1)
+        join_workers.assert_called_once()
 
     def test_extra_options(self):
         """Test the -W option for GHDL"""
-        with local.env(PATH=DIR+'/ghdl/fake-ghdl:' + local.env['PATH']):
-            self.assertNotEqual(run_vhdeps('ghdl', '-i', DIR+'/simple/all-good', '-W'), 0)
-            self.assertNotEqual(run_vhdeps('ghdl', '-i', DIR+'/simple/all-good', '-Wx'), 0)
-            self.assertNotEqual(run_vhdeps('ghdl', '-i', DIR+'/simple/all-good', '-W,x'), 0)
-            self.assertNotEqual(run_vhdeps('ghdl', '-i', DIR+'/simple/all-good', '-Wx,x'), 0)
+        with prepend_path(DIR+'/ghdl/fake-ghdl'):
+            self.assertNotEqual(run_vhdeps('ghdl', '-i', _SIMPLE['all-good'], '-W'), 0)
+            self.assertNotEqual(run_vhdeps('ghdl', '-i', _SIMPLE['all-good'], '-Wx'), 0)
+            self.assertNotEqual(run_vhdeps('ghdl', '-i', _SIMPLE['all-good'], '-W,x'), 0)
+            self.assertNotEqual(run_vhdeps('ghdl', '-i', _SIMPLE['all-good'], '-Wx,x'), 0)
             code, out, _ = run_vhdeps(
-                'ghdl', '-i', DIR+'/simple/all-good',
+                'ghdl', '-i', _SIMPLE['all-good'],
                 '-Wa,a,na,lyze', '-We,e,la,bo,rate', '-Wr,run', '-Wrx,a,b,c')
         self.assertEqual(code, 0)
         self.assertTrue(bool(re.search(r'ghdl -a [^\n]* a na lyze', out)))
@@ -282,93 +294,87 @@ class TestGhdlSpecific(TestCase):
         self.assertTrue(bool(re.search(r'ghdl -r [^\n]* -Wx,a,b,c', out)))
 
     @skipIf(
-        not coverage_supported(),
+        not COVERAGE_SUPPORTED,
         'missing gcov, lcov, genhtml, or lcov_cobertura, or ghdl with gcc backend')
     def test_file_conflict(self):
         """Test a filename/symlink conflict in the GHDL backend"""
         code, _, err = run_vhdeps('ghdl', '-i', DIR+'/ghdl/file-conflict-1')
         self.assertEqual(code, 1)
-        print(err)
         self.assertTrue('cannot create GHDL library symlink' in err)
 
         code, _, err = run_vhdeps('ghdl', '-i', DIR+'/ghdl/file-conflict-2')
         self.assertEqual(code, 1)
-        print(err)
         self.assertTrue('cannot create GHDL library symlink' in err)
 
-    @skipIf(not ghdl_installed(), 'missing ghdl')
+    @skipIf(not GHDL_INSTALLED, 'missing ghdl')
     def test_run_from_workdir(self):
         """Test running a GHDL test case from the working directory"""
-        with tempfile.TemporaryDirectory() as tempdir:
-            local['cp'](DIR+'/simple/all-good/test_tc.vhd', tempdir)
-            with local.cwd(tempdir):
-                code, _, _ = run_vhdeps('ghdl', '--no-tempdir')
-            self.assertEqual(code, 0)
-            self.assertTrue('test_tc.vhd' in os.listdir(tempdir))
+        tempdir = self.scratch_dir()
+        local['cp'](os.path.join(_SIMPLE['all-good'], 'test_tc.vhd'), tempdir)
+        with local.cwd(tempdir):
+            code, _, _ = run_vhdeps('ghdl', '--no-tempdir', capture=False)
+        self.assertEqual(code, 0)
+        self.assertTrue('test_tc.vhd' in os.listdir(tempdir))
 
 
 @skipIf(
-    not coverage_supported(),
+    not COVERAGE_SUPPORTED,
     'missing gcov, lcov, genhtml, or lcov_cobertura, or ghdl with gcc backend')
-class TestGhdlWithCoverage(TestCase):
+class TestGhdlWithCoverage(_ScratchDirTestCase):
     """Tests the code coverage features of the GHDL backend."""
 
+    @staticmethod
+    def run_ghdl(*args, **kwargs):
+        """Runs the GHDL target with GCC optimization turned off. Coverage
+        requires the GCC backend, and the test cases are too small for -O3
+        (the coverage default) to be worth its compilation time."""
+        return run_vhdeps('ghdl', *args, '-Wac,-O0', **kwargs)
+
     def test_cobertura(self):
         """Test writing Cobertura coverage data with GHDL"""
-        with tempfile.TemporaryDirectory() as tempdir:
-            code, _, _ = run_vhdeps(
-                'ghdl',
-                '-i', DIR+'/simple/multiple-ok',
-                '-c', '--cover-dir', tempdir)
-            self.assertEqual(code, 0)
-            print(os.listdir(tempdir))
-            self.assertTrue('coverage.xml' in os.listdir(tempdir))
+        tempdir = self.scratch_dir()
+        code, _, _ = self.run_ghdl(
+            '-i', _SIMPLE['multiple-ok'],
+            '-c', '--cover-dir', tempdir, capture=False)
+        self.assertEqual(code, 0)
+        self.assertTrue('coverage.xml' in os.listdir(tempdir))
 
     def test_no_lcov_cobertura(self):
         """Test the error message that is generated when lcov_cobertura is missing"""
         with MockMissingImport('lcov_cobertura'):
-            with tempfile.TemporaryDirectory() as tempdir:
-                code, _, err = run_vhdeps(
-                    'ghdl',
-                    '-i', DIR+'/simple/multiple-ok',
-                    '-c', '--cover-dir', tempdir)
-                self.assertEqual(code, 1)
-                self.assertTrue(
-                    'ImportError: the GHDL backend requires lcov_cobertura to '
-                    'generate Cobertura XML coverage data' in err)
+            tempdir = self.scratch_dir()
+            code, _, err = self.run_ghdl(
+                '-i', _SIMPLE['multiple-ok'],
+                '-c', '--cover-dir', tempdir)
+            self.assertEqual(code, 1)
+            self.assertTrue(
+                'ImportError: the GHDL backend requires lcov_cobertura to '
+                'generate Cobertura XML coverage data' in err)
 
     def test_gcov(self):
         """Test writing gcov coverage data with GHDL"""
-        with tempfile.TemporaryDirectory() as tempdir:
-            code, _, _ = run_vhdeps(
-                'ghdl',
-                '-i', DIR+'/simple/multiple-ok',
-                '-cgcov', '--cover-dir', tempdir)
-            self.assertEqual(code, 0)
-            print(os.listdir(tempdir))
-            self.assertTrue('foo_tc.gcda' in os.listdir(tempdir))
-            self.assertTrue('bar_tc.gcda' in os.listdir(tempdir))
-            self.assertTrue('foo_tc.gcno' in os.listdir(tempdir))
-            self.assertTrue('bar_tc.gcno' in os.listdir(tempdir))
+        tempdir = self.scratch_dir()
+        code, _, _ = self.run_ghdl(
+            '-i', _SIMPLE['multiple-ok'],
+            '-cgcov', '--cover-dir', tempdir, capture=False)
+        self.assertEqual(code, 0)
+        self.assertAllIn(
+            ['foo_tc.gcda', 'bar_tc.gcda', 'foo_tc.gcno', 'bar_tc.gcno'], os.listdir(tempdir))
 
     def test_lcov(self):
         """Test writing lcov coverage data with GHDL"""
-        with tempfile.TemporaryDirectory() as tempdir:
-            code, _, _ = run_vhdeps(
-                'ghdl',
-                '-i', DIR+'/simple/multiple-ok',
-                '-clcov', '--cover-dir', tempdir)
-            self.assertEqual(code, 0)
-            print(os.listdir(tempdir))
-            self.assertTrue('coverage.info' in os.listdir(tempdir))
+        tempdir = self.scratch_dir()
+        code, _, _ = self.run_ghdl(
+            '-i', _SIMPLE['multiple-ok'],
+            '-clcov', '--cover-dir', tempdir, capture=False)
+        self.assertEqual(code, 0)
+        self.assertTrue('coverage.info' in os.listdir(tempdir))
 
     def test_html(self):
         """Test writing coverage data in HTML form with GHDL"""
-        with tempfile.TemporaryDirectory() as tempdir:
-            code, _, _ = run_vhdeps(
-                'ghdl',
-                '-i', DIR+'/simple/multiple-ok',
-                '-chtml', '--cover-dir', tempdir)
-            self.assertEqual(code, 0)
-            print(os.listdir(tempdir))
-            self.assertTrue('index.html' in os.listdir(tempdir))
+        tempdir = self.scratch_dir()
+        code, _, _ = self.run_ghdl(
+            '-i', _SIMPLE['multiple-ok'],
+            '-chtml', '--cover-dir', tempdir, capture=False)
+        self.assertEqual(code, 0)
+        self.assertTrue('index.html' in os.listdir(tempdir))
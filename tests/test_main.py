@@ -2,36 +2,24 @@
 
 from unittest import TestCase
 import sys
-import io
+from .common import capture_output
 
 def run_vhdeps_main(mod, *args):
     """Runs the given vhdeps module as `'__main__'` with mockup `sys.stdout`,
     `sys.stderr`, and `sys.argv`, while capturing the exit code from any
     resulting `SystemExit`. Returns a three-tuple of the exit code, the
-    captured stdout string, and the captured stderr string."""
-    orig_out = sys.stdout
-    orig_err = sys.stderr
-    try:
-        sys.stdout = io.StringIO()
-        sys.stderr = io.StringIO()
+    captured stdout string, and the captured stderr string, as captured by
+    `capture_output()`."""
+    with capture_output() as (out, err):
+        sys.argv = ['vhdeps']
+        sys.argv.extend(args)
+        mod.__name__ = '__main__'
         try:
-            sys.argv = ['vhdeps']
-            sys.argv.extend(args)
-            mod.__name__ = '__main__'
-            try:
-                mod._init() #pylint: disable=W0212
-                code = 0
-            except SystemExit as exc:
-                code = exc.code
-        finally:
-            out = sys.stdout.getvalue()
-            err = sys.stderr.getvalue()
-            print(out, file=orig_out)
-            print(err, file=orig_out)
-        return code, out, err
-    finally:
-        sys.stdout = orig_out
-        sys.stderr = orig_err
+            mod._init() #pylint: disable=W0212
+            code = 0
+        except SystemExit as exc:
+            code = exc.code
+    return code, out.getvalue(), err.getvalue()
 
 class TestMain(TestCase):
     """Tests the vhdeps module when run as __main__."""
@@ -1,9 +1,12 @@
 """Miscellaneous test cases."""
 
 from unittest import TestCase
+from unittest.mock import patch
 import os
+import tempfile
 
-from vhdeps.vhdl import VhdFile
+from vhdeps.vhdl import VhdFile, VhdList
+from vhdeps import target, vhdl
 
 DIR = os.path.realpath(os.path.dirname(__file__))
 
@@ -29,3 +32,174 @@ class TestVhdFile(TestCase):
         fname = 'does-not-exist'
         with self.assertRaisesRegex(RuntimeError, fname):
             VhdFile(fname)
+
+    def test_parse_memoized(self):
+        """Test that unchanged files are only parsed once"""
+        fname = DIR + '/simple/all-good/test_tc.vhd'
+        VhdFile(fname)
+        # Spy on the parser itself; there is no public way to observe parsing.
+        parse_contents = vhdl._parse_contents #pylint: disable=W0212
+        with patch('vhdeps.vhdl._parse_contents', side_effect=parse_contents) as parse:
+            vhd = VhdFile(fname)
+            self.assertEqual(parse.call_count, 0)
+        self.assertEqual(vhd.entity_defs, ['test_tc'])
+
+    def test_reparse_on_change(self):
+        """Test that cached parse results are dropped when a file changes"""
+        with tempfile.TemporaryDirectory() as tempdir:
+            fname = tempdir + '/test.vhd'
+            with open(fname, 'w', encoding='utf-8') as fildes:
+                fildes.write('entity foo is end entity;\n')
+            self.assertEqual(VhdFile(fname).entity_defs, ['foo'])
+            with open(fname, 'w', encoding='utf-8') as fildes:
+                fildes.write('entity foobar is end entity;\n')
+            os.utime(fname, ns=(0, 0))
+            self.assertEqual(VhdFile(fname).entity_defs, ['foobar'])
+
+    def test_clear_parse_cache(self):
+        """Test that clearing the parse cache catches changes that the file
+        timestamps do not reflect"""
+        with tempfile.TemporaryDirectory() as tempdir:
+            fname = tempdir + '/test.vhd'
+            with open(fname, 'w', encoding='utf-8') as fildes:
+                fildes.write('entity foo is end entity;\n')
+            os.utime(fname, ns=(0, 0))
+            self.assertEqual(VhdFile(fname).entity_defs, ['foo'])
+            with open(fname, 'w', encoding='utf-8') as fildes:
+                fildes.write('entity bar is end entity;\n')
+            os.utime(fname, ns=(0, 0))
+            self.assertEqual(VhdFile(fname).entity_defs, ['foo'])
+            vhdl.clear_parse_cache()
+            self.assertEqual(VhdFile(fname).entity_defs, ['bar'])
+
+    def test_non_utf8_and_line_endings(self):
+        """Test parsing files that are not UTF-8 or use CR line endings"""
+        with tempfile.TemporaryDirectory() as tempdir:
+            fname = tempdir + '/test.vhd'
+            with open(fname, 'wb') as fildes:
+                fildes.write(
+                    b'-- caf\xe9 entity commented is\r'
+                    b'entity foo is end entity;\r'
+                    b'-- pragma simulation timeout 10 ms\r')
+            vhd = VhdFile(fname)
+            self.assertEqual(vhd.entity_defs, ['foo'])
+            self.assertEqual(vhd.sim_timeout, '10 ms')
+
+    def test_mmap(self):
+        """Test parsing memory-mapped files"""
+        with tempfile.TemporaryDirectory() as tempdir:
+            fname = tempdir + '/test.vhd'
+            with open(fname, 'w', encoding='utf-8') as fildes:
+                fildes.write(
+                    '-- PRAGMA Simulation Timeout 10 MS\n'
+                    'ENTITY Foo IS END ENTITY; -- entity commented is\n')
+            with patch('vhdeps.vhdl._MMAP_THRESHOLD', 1):
+                vhd = VhdFile(fname)
+            self.assertEqual(vhd.entity_defs, ['foo'])
+            self.assertEqual(vhd.sim_timeout, '10 ms')
+
+    def test_cache_write_failure(self):
+        """Test that failed parse cache writes leave no temporary files behind"""
+        with tempfile.TemporaryDirectory() as tempdir:
+            fname = tempdir + '/test.vhd'
+            with open(fname, 'w', encoding='utf-8') as fildes:
+                fildes.write('entity foo is end entity;\n')
+            cache_dir = tempdir + '/cache'
+            with patch('os.replace', side_effect=OSError):
+                vhd = VhdFile(fname, cache_dir=cache_dir)
+            self.assertEqual(vhd.entity_defs, ['foo'])
+            self.assertEqual(
+                [fnames for _, _, fnames in os.walk(cache_dir) if fnames], [])
+
+    def test_mixed_entity_uses(self):
+        """Test parsing files with both library-qualified and unqualified
+        entity instantiations"""
+        with tempfile.TemporaryDirectory() as tempdir:
+            fname = tempdir + '/test.vhd'
+            with open(fname, 'w', encoding='utf-8') as fildes:
+                fildes.write(
+                    'a: entity work.foo port map (x => y);\n'
+                    'b: entity bar port map (x => y);\n')
+            self.assertEqual(VhdFile(fname).entity_uses, [(None, 'bar'), ('work', 'foo')])
+
+    def test_relist_on_change(self):
+        """Test that cached directory listings are dropped when a directory
+        changes"""
+        with tempfile.TemporaryDirectory() as tempdir:
+            with open(tempdir + '/a.vhd', 'w', encoding='utf-8') as fildes:
+                fildes.write('entity a is end entity;\n')
+            vhd_list = VhdList()
+            vhd_list.add_dir(tempdir)
+            self.assertEqual(len(vhd_list.files), 1)
+            with open(tempdir + '/b.vhd', 'w', encoding='utf-8') as fildes:
+                fildes.write('entity b is end entity;\n')
+            os.utime(tempdir, ns=(0, 0))
+            vhd_list = VhdList()
+            vhd_list.add_dir(tempdir)
+            self.assertEqual(len(vhd_list.files), 2)
+
+    def test_symlink_loop(self):
+        """Test that directory symlink loops are only traversed once"""
+        with tempfile.TemporaryDirectory() as tempdir:
+            os.mkdir(tempdir + '/sub')
+            with open(tempdir + '/sub/a.vhd', 'w', encoding='utf-8') as fildes:
+                fildes.write('entity a is end entity;\n')
+            os.symlink('..', tempdir + '/sub/loop')
+            vhd_list = VhdList()
+            vhd_list.add_dir(tempdir)
+            self.assertEqual(len(vhd_list.files), 1)
+
+    def test_canonical_paths(self):
+        """Test that files added through directories get canonical paths, and
+        that files reachable through symlinks are only added once"""
+        with tempfile.TemporaryDirectory() as tempdir:
+            tempdir = os.path.realpath(tempdir)
+            os.mkdir(tempdir + '/sub')
+            with open(tempdir + '/sub/a.vhd', 'w', encoding='utf-8') as fildes:
+                fildes.write('entity a is end entity;\n')
+            with open(tempdir + '/b.vhd', 'w', encoding='utf-8') as fildes:
+                fildes.write('entity b is end entity;\n')
+            os.symlink('sub/a.vhd', tempdir + '/c.vhd')
+            os.symlink('sub', tempdir + '/link')
+            vhd_list = VhdList()
+            vhd_list.add_dir(tempdir + '/sub/..')
+            self.assertEqual(
+                sorted(vhd.fname for vhd in vhd_list.files),
+                [tempdir + '/b.vhd', tempdir + '/sub/a.vhd'])
+
+    def test_refresh(self):
+        """Test refreshing a VhdList after the sources change"""
+        with tempfile.TemporaryDirectory() as tempdir:
+            with open(tempdir + '/a.vhd', 'w', encoding='utf-8') as fildes:
+                fildes.write('entity a is end entity;\n')
+            vhd_list = VhdList()
+            vhd_list.add_dir(tempdir)
+            vhd_list.determine_compile_order()
+            self.assertEqual([vhd.unit for vhd in vhd_list.order], ['a'])
+            self.assertFalse(vhd_list.refresh())
+
+            # Make a depend on a new file b.
+            with open(tempdir + '/a.vhd', 'w', encoding='utf-8') as fildes:
+                fildes.write(
+                    'entity a is end entity;\n'
+                    'architecture x of a is begin\n'
+                    '  inst: entity work.b port map (x => y);\n'
+                    'end architecture;\n')
+            with open(tempdir + '/b.vhd', 'w', encoding='utf-8') as fildes:
+                fildes.write('entity b is end entity;\n')
+            os.utime(tempdir + '/a.vhd', ns=(0, 0))
+            os.utime(tempdir, ns=(0, 0))
+            self.assertTrue(vhd_list.refresh())
+            self.assertEqual(len(vhd_list.order), 0)
+            vhd_list.determine_compile_order()
+            self.assertEqual([vhd.unit for vhd in vhd_list.order], ['b', 'a'])
+            self.assertEqual([vhd.unit for vhd in vhd_list.top], ['a'])
+
+
+class TestTargets(TestCase):
+    """Tests for the target registry."""
+
+    def test_parser_reused(self):
+        """Test that target argument parsers are only constructed once"""
+        self.assertIs(target.get_argument_parser('dump'), target.get_argument_parser('dump'))
+        self.assertIsNot(target.get_argument_parser('dump'), target.get_argument_parser('ghdl'))
@@ -11,7 +11,7 @@ class TestStyle(TestCase):
 
     def test_correct(self):
         """Test input that passes all style checks"""
-        code, _, _ = run_vhdeps('dump', '-I', DIR + '/style/correct')
+        code, _, _ = run_vhdeps('dump', '-I', DIR + '/style/correct', capture=False)
         self.assertEqual(code, 0)
 
     def test_package_suffix_enforce(self):
@@ -22,7 +22,7 @@ class TestStyle(TestCase):
 
     def test_package_suffix_ignore(self):
         """Test ignoring a missing _pkg suffix when including non-strictly"""
-        code, _, _ = run_vhdeps('dump', '-i', DIR + '/style/missing-pkg-suffix')
+        code, _, _ = run_vhdeps('dump', '-i', DIR + '/style/missing-pkg-suffix', capture=False)
         self.assertEqual(code, 0)
 
     def test_multi_design_enforce(self):
@@ -35,7 +35,7 @@ class TestStyle(TestCase):
     def test_multi_design_ignore(self):
         """Test ignoring a multiple design units per file when including
         non-strictly"""
-        code, _, _ = run_vhdeps('dump', '-i', DIR + '/style/multi-design')
+        code, _, _ = run_vhdeps('dump', '-i', DIR + '/style/multi-design', capture=False)
         self.assertEqual(code, 0)
 
     def test_wrong_filename_enforce(self):
@@ -47,5 +47,5 @@ class TestStyle(TestCase):
     def test_wrong_filename_ignore(self):
         """Test ignoring an inconsistent filename when including
         non-strictly"""
-        code, _, _ = run_vhdeps('dump', '-i', DIR + '/style/wrong-filename')
+        code, _, _ = run_vhdeps('dump', '-i', DIR + '/style/wrong-filename', capture=False)
         self.assertEqual(code, 0)
@@ -4,7 +4,7 @@ from unittest import TestCase, skipIf
 import os
 import tempfile
 from plumbum import local
-from .common import run_vhdeps, MockMissingImport
+from .common import run_vhdeps, prepend_path, MockMissingImport
 
 DIR = os.path.realpath(os.path.dirname(__file__))
 
@@ -73,14 +73,14 @@ class TestVsimReal(TestCase):
     def test_error(self):
         """Test running vsim on a single test case that fails to
         elaborate"""
-        code, _, _ = run_vhdeps('vsim', '-i', DIR+'/simple/elab-error')
+        code, _, _ = run_vhdeps('vsim', '-i', DIR+'/simple/elab-error', capture=False)
         self.assertNotEqual(code, 0)
         self.assertFalse('modelsim.ini' in os.listdir(DIR+'/simple/elab-error'))
         self.assertFalse('vsim.wlf' in os.listdir(DIR+'/simple/elab-error'))
 
     def parse_error(self):
         """Test running vsim on a single test case that fails to compile"""
-        code, _, _ = run_vhdeps('vsim', '-i', DIR+'/simple/parse-error')
+        code, _, _ = run_vhdeps('vsim', '-i', DIR+'/simple/parse-error', capture=False)
         self.assertNotEqual(code, 0)
         self.assertFalse('modelsim.ini' in os.listdir(DIR+'/simple/parse-error'))
         self.assertFalse('vsim.wlf' in os.listdir(DIR+'/simple/parse-error'))
@@ -135,7 +135,7 @@ class TestVsimReal(TestCase):
         with tempfile.TemporaryDirectory() as tempdir:
             local['cp'](DIR+'/complex/file-io/test_tc.vhd', tempdir)
             with local.cwd(tempdir):
-                code, _, _ = run_vhdeps('vsim')
+                code, _, _ = run_vhdeps('vsim', capture=False)
             self.assertEqual(code, 0)
             self.assertEqual(sorted(os.listdir(tempdir)), ['output_file.txt', 'test_tc.vhd'])
 
@@ -226,13 +226,13 @@ class TestVsimMocked(TestCase):
             code, _, _ = run_vhdeps(
                 'vsim', '--tcl',
                 '-i', DIR+'/simple/all-good',
-                '-o', tempdir + '/sim.do')
+                '-o', tempdir + '/sim.do', capture=False)
             self.assertEqual(code, 0)
             self.assertTrue(os.path.isfile(tempdir + '/sim.do'))
 
     def test_cleanup(self):
         """Test .cleanup file handling"""
-        with local.env(PATH=DIR+'/vsim/fake-vsim:' + local.env['PATH']):
+        with prepend_path(DIR+'/vsim/fake-vsim'):
             with tempfile.TemporaryDirectory() as tempdir:
                 with local.cwd(tempdir):
                     with open('.cleanup', 'w') as fil:
@@ -242,7 +242,7 @@ class TestVsimMocked(TestCase):
                         pass
                     code, _, _ = run_vhdeps(
                         'vsim', '--no-tempdir',
-                        '-i', DIR+'/simple/all-good')
+                        '-i', DIR+'/simple/all-good', capture=False)
                     self.assertEqual(code, 0)
                     self.assertEqual(sorted(os.listdir(tempdir)), ['vsim.do', 'vsim.log'])
 
@@ -268,7 +268,7 @@ class TestVsimMocked(TestCase):
 
     def test_gui_tempdir(self):
         """Test running (a fake) vsim in GUI mode in a temporary directory"""
-        with local.env(PATH=DIR+'/vsim/fake-vsim:' + local.env['PATH']):
+        with prepend_path(DIR+'/vsim/fake-vsim'):
             with tempfile.TemporaryDirectory() as tempdir:
                 with local.cwd(tempdir):
                     code, out, _ = run_vhdeps('vsim', '--gui', '-i', DIR+'/simple/all-good')
@@ -279,7 +279,7 @@ class TestVsimMocked(TestCase):
 
     def test_gui_no_tempdir(self):
         """Test running (a fake) vsim in GUI mode in the working directory"""
-        with local.env(PATH=DIR+'/vsim/fake-vsim:' + local.env['PATH']):
+        with prepend_path(DIR+'/vsim/fake-vsim'):
             with tempfile.TemporaryDirectory() as tempdir:
                 with local.cwd(tempdir):
                     code, out, _ = run_vhdeps(
@@ -293,7 +293,7 @@ class TestVsimMocked(TestCase):
     def test_batch_no_tempdir(self):
         """Test running (a fake) vsim in batch mode in the working
         directory"""
-        with local.env(PATH=DIR+'/vsim/fake-vsim:' + local.env['PATH']):
+        with prepend_path(DIR+'/vsim/fake-vsim'):
             with tempfile.TemporaryDirectory() as tempdir:
                 with local.cwd(tempdir):
                     code, out, _ = run_vhdeps('vsim', '--no-tempdir', '-i', DIR+'/simple/all-good')
@@ -19,17 +19,18 @@ more script-friendly interface, use the `vhdeps.vhdl' submodule directly."""
 
 import sys
 import os
+import stat
 import glob
 import argparse
+import functools
 import vhdeps.vhdl as vhdl
 import vhdeps.target as target_mod
 from vhdeps.version import __version__
 
-def run_cli(args=None):
-    """Runs the vhdeps CLI. The command-line arguments are taken from `args`
-    when specified, or `sys.argv` by default. The return value is the exit code
-    for the process. If the backtrace option is passed, exceptions will not be
-    caught."""
+@functools.lru_cache(maxsize=None)
+def _build_parser():
+    """Constructs the argument parser for the vhdeps CLI. The parser is the
+    same for every invocation, so it is only built once per process."""
 
     parser = argparse.ArgumentParser(
         usage='vhdeps <target> [entities...] [flags...] [--] [target-flags...]',
@@ -88,6 +89,15 @@ def run_cli(args=None):
         '"black-box" components. Useful for interfaces to Verilog or for vendor '
         'libraries.')
 
+    parser.add_argument(
+        '-f', '--file-list', metavar='file',
+        action='append', default=[],
+        help='Reads a list of files/directories to include from the given '
+        'file, one per line, using the same {{version:}lib:}path syntax as -i. '
+        'Relative paths are interpreted relative to the working directory. '
+        'Empty lines and lines starting with # are ignored. This is useful to '
+        'include a precomputed list of files instead of scanning directories.')
+
     # Filters.
     parser.add_argument(
         '-d', '--desired-version', metavar='desired-version',
@@ -118,6 +128,23 @@ def run_cli(args=None):
         'considered simulation-only, if it matches *.syn.* it is considered '
         'synthesis-only. Specify -m all to disable this filter.')
 
+    # Performance.
+    parser.add_argument(
+        '--parse-jobs', metavar='jobs',
+        type=int, default=None,
+        help='Number of worker processes used to read and parse the VHDL files '
+        'in included directories. Defaults to parsing them one at a time.')
+
+    parser.add_argument(
+        '--cache-dir', metavar='dir',
+        default=None,
+        help='Directory used to cache VHDL parse results across runs. Entries '
+        'are indexed by filename, modification time, and size, as well as by '
+        'the hash of the file contents. Defaults to the VHDEPS_CACHE_DIR '
+        'environment variable; caching is disabled if neither is set. The '
+        'cached parse results are trusted, so the directory must not be '
+        'writable by other users.')
+
     # Output control.
     parser.add_argument(
         '-o', '--outfile',
@@ -146,6 +173,15 @@ def run_cli(args=None):
         '--vhdeps-version', action='version', version='vhdeps ' + __version__,
         help='Prints the current version of vhdeps and exits.')
 
+    return parser
+
+def run_cli(args=None):
+    """Runs the vhdeps CLI. The command-line arguments are taken from `args`
+    when specified, or `sys.argv` by default. The return value is the exit code
+    for the process. If the backtrace option is passed, exceptions will not be
+    caught."""
+    parser = _build_parser()
+
     try:
 
         # Parse the command line.
@@ -193,34 +229,82 @@ def run_cli(args=None):
     vhd_list = vhdl.VhdList(
         mode=args.mode,
         desired_version=args.desired_version,
-        required_version=args.version)
+        required_version=args.version,
+        jobs=args.parse_jobs,
+        cache_dir=args.cache_dir or os.environ.get('VHDEPS_CACHE_DIR') or None)
 
     try:
-        # Add the specified files/directories to the VHDL file list.
+        # Add the specified files/directories to the VHDL file list. Paths
+        # that were already included with the same settings, either directly
+        # or through a parent directory, would only add files that are already
+        # in the list, so they are skipped.
         def add_dir(arglist, **kwargs):
+            added_dirs = {}
+            added_files = set()
+
+            def is_added(path, settings, is_dir=False):
+                path = os.path.realpath(path)
+                if (settings, path) in added_files:
+                    return True
+                # Only directories and files that add_dir() would pick up are
+                # covered by a parent directory.
+                if not is_dir and not path.lower().endswith(vhdl.VHDL_EXTENSIONS):
+                    return False
+                for dirname in added_dirs.get(settings, ()):
+                    if path == dirname or path.startswith(dirname + os.sep):
+                        return True
+                return False
+
             for arg in arglist:
                 arg = arg.split(':', maxsplit=2)
                 fname = arg[-1]
                 lib = arg[-2] if len(arg) >= 2 else 'work'
                 override_version = int(arg[-3]) if len(arg) >= 3 else None
+                settings = (lib, override_version)
                 if '*' in fname or '?' in fname:
                     for match in glob.glob(fname):
+                        if is_added(match, settings):
+                            continue
+                        added_files.add((settings, os.path.realpath(match)))
                         vhd_list.add_file(
                             match, lib=lib, override_version=override_version, **kwargs)
-                elif os.path.isdir(fname):
+                    continue
+
+                # Literal paths don't need to go through glob; a single stat()
+                # tells us whether it's a directory or a file.
+                try:
+                    mode = os.stat(fname).st_mode
+                except OSError:
+                    mode = 0
+                if stat.S_ISDIR(mode):
+                    if is_added(fname, settings, is_dir=True):
+                        continue
+                    added_dirs.setdefault(settings, []).append(os.path.realpath(fname))
                     vhd_list.add_dir(
                         fname, lib=lib, override_version=override_version, **kwargs)
-                elif os.path.isfile(fname):
+                elif stat.S_ISREG(mode):
+                    if is_added(fname, settings):
+                        continue
+                    added_files.add((settings, os.path.realpath(fname)))
                     vhd_list.add_file(
                         fname, lib=lib, override_version=override_version, **kwargs)
                 else:
                     raise ValueError('file/directory not found: "%s"' % fname)
 
         # Default to including the working directory if no includes are specified.
-        if not args.include and not args.strict and not args.external:
+        if not args.include and not args.strict and not args.external and not args.file_list:
             print('Including the current working directory recursively by default...',
                   file=sys.stderr)
-            args.include.append('.')
+            args.include = ['.']
+
+        # Add the contents of the file lists to the regular includes. Note that
+        # args.include may be the parser's default list, so it must not be
+        # modified in place.
+        for list_fname in args.file_list:
+            with open(list_fname, 'r', encoding='utf-8') as list_file:
+                args.include = args.include + [
+                    line.strip() for line in list_file
+                    if line.strip() and not line.strip().startswith('#')]
 
         add_dir(args.include)
         add_dir(args.strict, strict=True)
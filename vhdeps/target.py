@@ -18,6 +18,7 @@ subdirectory."""
 import os
 import importlib
 import argparse
+import functools
 
 _TARGETS = {}
 
@@ -44,9 +45,10 @@ def get_target(name):
     if the target does not exist."""
     return _TARGETS.get(name, None)
 
+@functools.lru_cache(maxsize=None)
 def get_argument_parser(name):
     """Returns the argparse `ArgumentParser` object for the target going by the
-    given name."""
+    given name. The parser is only constructed once per target."""
     mod = get_target(name)
     parser = argparse.ArgumentParser(
         prog='vhdeps %s' % name,
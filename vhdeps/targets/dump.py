@@ -16,9 +16,11 @@
 
 def run(vhd_list, output_file):
     """Runs this backend."""
-    for vhd in vhd_list.order:
-        output_file.write('%s %s %04d %s\n' % (
-            'top' if vhd in vhd_list.top else 'dep',
+    top = set(vhd_list.top)
+    output_file.write(''.join([
+        '%s %s %04d %s\n' % (
+            'top' if vhd in top else 'dep',
             vhd.lib,
             vhd.version,
-            vhd.fname))
+            vhd.fname)
+        for vhd in vhd_list.order]))
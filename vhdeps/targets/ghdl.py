@@ -236,10 +236,23 @@ def _run_test_case(output_file, test_case, vcd_dir, ghdl_elaborate, ghdl_run):
         if delete_executable:
             os.remove(executable_symlink)
 
+def _open_gtkwave(vcd_file):
+    """Opens the given VCD file in gtkwave in the foreground, returning when
+    the user closes it."""
+    from plumbum import local, FG #pylint: disable=C0415
+    local['gtkwave'][vcd_file] & FG #pylint: disable=W0104
+
+def _join_workers(pending_test_cases, pool):
+    """Waits for the worker threads in pool to run all the test cases in the
+    pending_test_cases queue and exit."""
+    pending_test_cases.join()
+    for thread in pool:
+        thread.join()
+
 def _run(vhd_list, output_file, jobs=None, coverage=None,
          cover_dir=None, vcd_dir=None, gui=False, **kwargs):
     """Runs this backend in the current working directory."""
-    from plumbum import local, FG #pylint: disable=C0415
+    from plumbum import local #pylint: disable=C0415
 
     # Construct the plumbum command representations of the three GHDL commands
     # we need, complete with all flags that are not file-dependent.
@@ -351,9 +364,7 @@ def _run(vhd_list, output_file, jobs=None, coverage=None,
             # Wait for the threads to finish. If we get a keyboard interrupt,
             # remove all the pending test cases from the queue and wait again.
             try:
-                pending_test_cases.join()
-                for thread in pool:
-                    thread.join()
+                _join_workers(pending_test_cases, pool)
             except KeyboardInterrupt:
                 try:
                     while True:
@@ -407,7 +418,7 @@ def _run(vhd_list, output_file, jobs=None, coverage=None,
             copy = local['cp']
             if cover_dir != os.getcwd():
                 for fname in os.listdir(os.getcwd()):
-                    if fname.endswith('.gcda') or fname.endswith('.gcno'):
+                    if fname.endswith(('.gcda', '.gcno')):
                         copy('-f', '-t', cover_dir, fname)
 
         elif coverage == 'lcov':
@@ -446,7 +457,7 @@ def _run(vhd_list, output_file, jobs=None, coverage=None,
         if vcd_file is None:
             print('No data available to open gtkwave for.')
         else:
-            local['gtkwave'][vcd_file] & FG #pylint: disable=W0104
+            _open_gtkwave(vcd_file)
 
     return int(failed)
 
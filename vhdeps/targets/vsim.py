@@ -905,8 +905,8 @@ def add_arguments(parser):
 
 def _write_tcl(vhd_list, tcl_file, suppress_warnings, extra_flags, **kwargs):
     """Writes the TCL file for the given VHDL list and testcase pattern to
-    `outfile`."""
-    tcl_file.write(_HEADER)
+    `outfile`. The script is assembled in memory and written in one go."""
+    tcl = [_HEADER]
 
     # Parse the -W command line parameters.
     vcom_flags = []
@@ -948,7 +948,7 @@ def _write_tcl(vhd_list, tcl_file, suppress_warnings, extra_flags, **kwargs):
         flags.extend(vcom_flags)
         flags = ' '.join(flags)
 
-        tcl_file.write('  add_source {%s} {%s} {%s}\n' % (vhd.fname, vhd.lib, flags))
+        tcl.append('  add_source {%s} {%s} {%s}\n' % (vhd.fname, vhd.lib, flags))
 
     test_cases = get_test_cases(vhd_list, **kwargs)
     for test_case in test_cases:
@@ -975,11 +975,12 @@ def _write_tcl(vhd_list, tcl_file, suppress_warnings, extra_flags, **kwargs):
         flags.extend(vsim_flags)
         flags = ' '.join(flags)
 
-        tcl_file.write('  add_test {%s} {%s} {%s} \\\n    {%s} {%s} %s %s {%s}\n' % (
+        tcl.append('  add_test {%s} {%s} {%s} \\\n    {%s} {%s} %s %s {%s}\n' % (
             test_case.file.lib, test_case.unit, os.path.dirname(test_case.file.fname),
             test_case.file.get_timeout(), flags, suppress_warnings_tc, log_all, wave_config))
 
-    tcl_file.write(_FOOTER)
+    tcl.append(_FOOTER)
+    tcl_file.write(''.join(tcl))
 
 def _run(vhd_list, output_file, gui=False, **kwargs):
     """Runs this backend in the current working directory."""
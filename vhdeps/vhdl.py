@@ -19,7 +19,8 @@ import os
 import sys
 import functools
 import fnmatch
-from collections import deque
+import itertools
+from collections import OrderedDict, defaultdict, deque, namedtuple
 
 class StyleError(Exception):
     """Thrown to indicate that a style error was detected during a strict
@@ -40,34 +41,67 @@ def _parse_version(version):
         version += 1900
     return version
 
+# The first three digits of the four-digit years accepted as version tags,
+# which range from 1970 to 2069.
+_YEAR_PREFIXES = frozenset(['197', '198', '199', '200', '201', '202', '203', '204', '205', '206'])
+
+def _is_version_tag(tag):
+    """Returns whether the given filename tag is a VHDL version tag, i.e. a
+    two-digit year or a four-digit year from 1970 to 2069."""
+    if not tag.isdecimal():
+        return False
+    if len(tag) == 2:
+        return True
+    return len(tag) == 4 and tag[:3] in _YEAR_PREFIXES
+
+def _glob_to_regex(pattern):
+    """Converts a shell-style wildcard pattern to an unanchored regular
+    expression string, such that it can be combined with others."""
+    regex = fnmatch.translate(pattern)
+    if regex.endswith('\\Z'):
+        regex = regex[:-2]
+    return regex
+
 @functools.total_ordering
 class VhdFile:
     """Represents a VHDL file."""
 
+    # A project can easily consist of thousands of these objects, which are
+    # accessed a lot during dependency resolution, so avoid a per-instance
+    # __dict__.
+    __slots__ = (
+        'fname', 'lib', 'strict', 'allow_bb', 'versions', 'version',
+        'use_for_synthesis', 'use_for_simulation', 'stamp',
+        'entity_defs', 'entity_uses', 'component_defs', 'component_uses',
+        'package_defs', 'package_uses', 'unit', 'is_pkg', 'sim_timeout',
+        'before', 'anywhere', 'before_sorted', 'anywhere_sorted')
+
+    # The design unit patterns operate on the raw bytes of the file; they only
+    # capture ASCII identifiers, so only the matches need to be decoded.
     ENTITY_DEF = re.compile(
-        r'entity\s+([a-zA-Z][a-zA-Z0-9_]*)\s+is')
+        rb'entity\s+([a-zA-Z][a-zA-Z0-9_]*)\s+is')
     ENTITY_USE = re.compile(
-        r':\s*entity\s+(([a-zA-Z][a-zA-Z0-9_]*)\.)?'
-        r'([a-zA-Z][a-zA-Z0-9_]*)\s*[(\sport)|(\sgeneric)|;]')
-    ENTITY_IGNORE = re.compile(
-        r'\-\-\s*pragma\s+vhdeps\s+ignore\s+entity\s+([a-zA-Z0-9_\.]+)')
+        rb':\s*entity\s+(([a-zA-Z][a-zA-Z0-9_]*)\.)?'
+        rb'([a-zA-Z][a-zA-Z0-9_]*)\s*[(\sport)|(\sgeneric)|;]')
     COMPONENT_DEF = re.compile(
-        r'component\s+([a-zA-Z][a-zA-Z0-9_]*)\s+is')
+        rb'component\s+([a-zA-Z][a-zA-Z0-9_]*)\s+is')
     COMPONENT_USE = re.compile(
-        r':\s*(?:component\s+)?([a-zA-Z][a-zA-Z0-9_]*)\s*((\sport)|(\sgeneric))\s+map')
-    COMPONENT_IGNORE = re.compile(
-        r'\-\-\s*pragma\s+vhdeps\s+ignore\s+component\s+([a-zA-Z0-9_\.]+)')
+        rb':\s*(?:component\s+)?([a-zA-Z][a-zA-Z0-9_]*)\s+(?:port|generic)\s+map')
     PACKAGE_DEF = re.compile(
-        r'package\s+([a-zA-Z][a-zA-Z0-9_]*)\s+is')
+        rb'package\s+([a-zA-Z][a-zA-Z0-9_]*)\s+is')
     PACKAGE_USE = re.compile(
-        r'use\s+([a-zA-Z][a-zA-Z0-9_]*)\.([a-zA-Z][a-zA-Z0-9_]*)')
-    PACKAGE_IGNORE = re.compile(
-        r'\-\-\s*pragma\s+vhdeps\s+ignore\s+package\s+([a-zA-Z0-9_\.]+)')
-    TIMEOUT = re.compile(
-        r'\-\-\s*pragma\s+simulation\s+timeout\s+([0-9]+(?:\.[0-9]*)?\s+[pnum]?s)')
+        rb'use\s+([a-zA-Z][a-zA-Z0-9_]*)\.([a-zA-Z][a-zA-Z0-9_]*)')
+    COMMENT = re.compile(
+        rb'--[^\r\n]*')
+    PRAGMA = re.compile(
+        rb'\-\-\s*pragma\s+(?:'
+        rb'vhdeps\s+ignore\s+(?P<kind>entity|component|package)\s+(?P<name>[a-zA-Z0-9_\.]+)|'
+        rb'simulation\s+timeout\s+(?P<timeout>[0-9]+(?:\.[0-9]*)?\s+[pnum]?s))',
+        re.IGNORECASE)
 
     def __init__(self, fname, lib='work', override_version=None,
-                 desired_version=2008, strict=False, allow_bb=False):
+                 desired_version=2008, strict=False, allow_bb=False, *,
+                 cache_dir=None, canonical=False):
         """Creates a representation of the definitions and uses of a VHDL file
         for dependency resolution. `fname` should be the path to the VHDL file.
         `lib` can be used to specify a nonstandard VHDL library for the file.
@@ -75,26 +109,38 @@ class VhdFile:
         for as a 2- or 4-digit year. `strict` can be set to True to enforce
         certain style rules when parsing. `allow_bb` can be set to allow
         components defined in this file to remain black boxes, useful for
-        vendor libraries containing macros and primitives."""
+        vendor libraries containing macros and primitives. `cache_dir`
+        optionally specifies a directory in which parse results are cached
+        across runs, keyed by the hash of the file contents. `canonical` can
+        be set when `fname` is known to be canonical already, such that it is
+        not resolved again."""
 
         # Make sure the filename is canonical, so the hash and equality
-        # functions work as intended.
-        fname = os.path.realpath(fname)
+        # functions work as intended. It is also interned: the same file is
+        # usually represented by more than one VhdFile object over time (for
+        # instance after refresh()), and equal interned strings compare by
+        # identity.
+        if not canonical:
+            fname = os.path.realpath(fname)
+        fname = sys.intern(fname)
 
         # Initialize and save parameters.
         super().__init__()
         self.fname = fname
-        self.lib = lib
+        self.lib = sys.intern(lib)
         self.strict = strict
         self.allow_bb = allow_bb
 
+        # Split the filename into its dot-separated tags. The first and last
+        # components are the name and the extension, so they're not tags.
+        tags = fname.split('.')[1:-1]
+
         # Determine the VHDL versions this file is supposed to be compatible
         # with.
         if override_version is not None:
             versions = (override_version,)
         else:
-            versions = map(lambda x: x.group(1),
-                           re.finditer(r'\.(19[7-9]\d|20[0-6]\d|\d\d)(?=\.)', fname))
+            versions = filter(_is_version_tag, tags)
         self.versions = set(map(_parse_version, versions))
 
         # Determine the version that we'll be compiling the file with if we
@@ -103,51 +149,23 @@ class VhdFile:
                            key=lambda v: abs(v - desired_version), default=desired_version)
 
         # Determine whether this file is simulation- or synthesis-only.
-        self.use_for_synthesis = '.sim.' not in fname
-        self.use_for_simulation = '.syn.' not in fname
+        self.use_for_synthesis = 'sim' not in tags
+        self.use_for_simulation = 'syn' not in tags
 
-        # Read and "parse" the file. "Parsing" is limited to stripping comments
-        # and pattern matching to keep things simple.
+        # Read and "parse" the file, or reuse the result of an earlier parse
+        # if the file hasn't changed since.
         try:
-            with open(fname, 'r') as fildes:
-                contents = fildes.read().lower()
+            stat = os.stat(fname)
         except Exception as exc:
             raise RuntimeError('failed to read VHDL file at %s: %s' % (self.fname, exc))
-        sim_timeout = [match.group(1)for match in self.TIMEOUT.finditer(contents)]
-
-        entity_ignore = {
-            match.group(1)
-            for match in self.ENTITY_IGNORE.finditer(contents)}
-        component_ignore = {
-            match.group(1)
-            for match in self.COMPONENT_IGNORE.finditer(contents)}
-        package_ignore = {
-            match.group(1)
-            for match in self.PACKAGE_IGNORE.finditer(contents)}
-
-        contents = ' '.join((line.split('--')[0] for line in contents.split('\n')))
-
-        self.entity_defs = sorted({
-            match.group(1)
-            for match in self.ENTITY_DEF.finditer(contents)})
-        self.entity_uses = sorted({
-            (match.group(2), match.group(3))
-            for match in self.ENTITY_USE.finditer(contents)
-            if match.group(3) not in entity_ignore})
-        self.component_defs = sorted({
-            match.group(1)
-            for match in self.COMPONENT_DEF.finditer(contents)})
-        self.component_uses = sorted({
-            match.group(1)
-            for match in self.COMPONENT_USE.finditer(contents)
-            if match.group(1) not in component_ignore})
-        self.package_defs = sorted({
-            match.group(1)
-            for match in self.PACKAGE_DEF.finditer(contents)})
-        self.package_uses = sorted({
-            (match.group(1), match.group(2))
-            for match in self.PACKAGE_USE.finditer(contents)
-            if match.group(2) not in package_ignore})
+        self.stamp = (stat.st_mtime_ns, stat.st_size)
+        contents = _parse_vhd(fname, stat.st_mtime_ns, stat.st_size, cache_dir)
+        self.entity_defs = list(contents.entity_defs)
+        self.entity_uses = list(contents.entity_uses)
+        self.component_defs = list(contents.component_defs)
+        self.component_uses = list(contents.component_uses)
+        self.package_defs = list(contents.package_defs)
+        self.package_uses = list(contents.package_uses)
 
         # If this file contains a single entity or package, record its name.
         if len(self.entity_defs) + len(self.package_defs) != 1:
@@ -160,10 +178,7 @@ class VhdFile:
 
         # Record "simulation timeout" pragma. This should be specified in test
         # cases to indicate the expected runtime.
-        if sim_timeout:
-            self.sim_timeout = sim_timeout[0]
-        else:
-            self.sim_timeout = None
+        self.sim_timeout = contents.sim_timeout
 
         # Enforce style rules if strict checking is enabled.
         if strict:
@@ -174,9 +189,12 @@ class VhdFile:
             if os.path.basename(self.fname).lower().split('.')[0] != self.unit.lower():
                 raise StyleError('Filename does not match design unit for %s' % self.fname)
 
-        # Before and anywhere are populated by resolve_dependencies.
+        # Before and anywhere are populated by resolve_dependencies, along
+        # with copies of them sorted by filename.
         self.before = None
         self.anywhere = None
+        self.before_sorted = None
+        self.anywhere_sorted = None
 
     def resolve_dependencies(self, resolver, ignore_libs=None):
         """Using a function that resolves a VHDL design unit identification
@@ -266,6 +284,11 @@ class VhdFile:
                     'while resolving component %s in %s:\n%s' %
                     (comp, self, exc))
 
+        # The compile order is built by visiting dependencies in filename
+        # order, possibly many times for the same file, so sort them once.
+        self.before_sorted = sorted(self.before)
+        self.anywhere_sorted = sorted(self.anywhere)
+
     def get_timeout(self):
         """Returns the value of the simulation timeout pragma for test cases.
         This reports a warning to stderr and returns '1 ms' if it isn't
@@ -296,15 +319,305 @@ class VhdFile:
 
     __repr__ = __str__
 
+_VhdContents = namedtuple('_VhdContents', [
+    'entity_defs', 'entity_uses', 'component_defs', 'component_uses',
+    'package_defs', 'package_uses', 'sim_timeout'])
+
+# Version of the on-disk parse cache format. This must be incremented whenever
+# the parse results for a given file could change.
+_CACHE_VERSION = 2
+
+# Files at least this large are memory-mapped instead of read into memory.
+_MMAP_THRESHOLD = 1 << 20
+
+# In-memory cache of parse results, mapping canonical VHDL filenames to
+# `(mtime_ns, size, _VhdContents)` three-tuples. Only the most recent result is
+# kept for each file, and only for the `_PARSE_CACHE_SIZE` most recently used
+# files, such that the cache does not grow without bound in long-lived
+# processes.
+_PARSE_CACHE = OrderedDict()
+_PARSE_CACHE_SIZE = 16384
+
+def _cache_parse_result(fname, mtime_ns, size, contents):
+    """Adds a parse result to the in-memory parse cache, evicting the least
+    recently used entry if the cache is full."""
+    _PARSE_CACHE[fname] = (mtime_ns, size, contents)
+    _PARSE_CACHE.move_to_end(fname)
+    if len(_PARSE_CACHE) > _PARSE_CACHE_SIZE:
+        _PARSE_CACHE.popitem(last=False)
+
+def clear_parse_cache():
+    """Clears the in-memory caches of VHDL parse results and directory
+    listings, such that all files and directories are read again the next time
+    they are added to a `VhdList`. The on-disk cache, if any, is not
+    affected."""
+    _PARSE_CACHE.clear()
+    _list_dir.cache_clear()
+
+def _parse_vhd(fname, mtime_ns, size, cache_dir=None):
+    """Returns the `_VhdContents` tuple for the VHDL file at canonical path
+    `fname`, given its current modification time and size. The file is only
+    read and parsed again if it changed since the last call. If `cache_dir` is
+    specified, results are also stored in and loaded from that directory,
+    indexed both by filename, modification time and size, and by the hash of
+    the file contents. The former allows unchanged files to be skipped
+    without reading them; the latter still avoids parsing files that were
+    only touched, moved, or copied."""
+    cached = _PARSE_CACHE.get(fname)
+    if cached is not None and cached[0] == mtime_ns and cached[1] == size:
+        _PARSE_CACHE.move_to_end(fname)
+        return cached[2]
+
+    contents = None
+    if cache_dir is not None:
+        stamp_fname = _cache_entry_fname(
+            cache_dir, 'stamp', fname.encode('utf-8', 'surrogateescape'))
+        entry = _load_cache_entry(stamp_fname)
+        if isinstance(entry, tuple) and len(entry) == 4 and entry[:3] == (fname, mtime_ns, size):
+            contents = _to_vhd_contents(entry[3])
+
+    if contents is None:
+        contents = _read_vhd(fname, size, cache_dir)
+        if cache_dir is not None:
+            _store_cache_entry(stamp_fname, (fname, mtime_ns, size, contents))
+
+    _cache_parse_result(fname, mtime_ns, size, contents)
+    return contents
+
+def _read_vhd(fname, size, cache_dir=None):
+    """Reads and "parses" the VHDL file at `fname`, which is expected to be
+    `size` bytes long. The result is returned as a `_VhdContents` tuple. If
+    `cache_dir` is specified, parse results are also stored in and loaded from
+    that directory, keyed by the hash of the file contents."""
+    try:
+        with open(fname, 'rb') as fildes:
+            contents = None
+            if size >= _MMAP_THRESHOLD:
+                import mmap #pylint: disable=C0415
+                try:
+                    contents = mmap.mmap(fildes.fileno(), 0, access=mmap.ACCESS_READ)
+                except ValueError:
+                    # The file was truncated to zero length since it was
+                    # stat'd.
+                    pass
+            if contents is None:
+                contents = fildes.read()
+    except Exception as exc:
+        raise RuntimeError('failed to read VHDL file at %s: %s' % (fname, exc))
+    try:
+        return _parse_or_load(contents, cache_dir)
+    finally:
+        if not isinstance(contents, bytes):
+            contents.close()
+
+def _parse_vhd_worker(fname, mtime_ns, size, cache_dir):
+    """Wrapper for `_parse_vhd()` used in worker processes. Returns `None` if
+    the file cannot be read, such that the error is reported by the main
+    process when it gets to the file."""
+    try:
+        return _parse_vhd(fname, mtime_ns, size, cache_dir)
+    except RuntimeError:
+        return None
+
+def _prefetch_vhds(fnames, jobs, cache_dir):
+    """Parses those of the given VHDL files that are not in the in-memory
+    parse cache yet in parallel using up to `jobs` worker processes, and adds
+    the results to the cache. Parsing is CPU-bound and the regular expression
+    engine holds the global interpreter lock, so threads would not help. The
+    filenames must be canonical."""
+    todo = []
+    for fname in fnames:
+        fname = sys.intern(fname)
+        try:
+            stat = os.stat(fname)
+        except OSError:
+            continue
+        cached = _PARSE_CACHE.get(fname)
+        if cached is None or cached[0] != stat.st_mtime_ns or cached[1] != stat.st_size:
+            todo.append((fname, stat.st_mtime_ns, stat.st_size))
+    if len(todo) <= 1:
+        return
+    from concurrent.futures import ProcessPoolExecutor #pylint: disable=C0415
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        results = executor.map(
+            _parse_vhd_worker,
+            [fname for fname, _, _ in todo],
+            [mtime_ns for _, mtime_ns, _ in todo],
+            [size for _, _, size in todo],
+            itertools.repeat(cache_dir),
+            chunksize=max(1, len(todo) // (4 * jobs)))
+        for (fname, mtime_ns, size), contents in zip(todo, results):
+            if contents is not None:
+                _cache_parse_result(fname, mtime_ns, size, contents)
+
+def _parse_or_load(contents, cache_dir):
+    """Returns the `_VhdContents` tuple for the given file contents, loading it
+    from or storing it in the cache in `cache_dir` if it is not `None`."""
+    if cache_dir is None:
+        return _parse_contents(contents)
+
+    cache_fname = _cache_entry_fname(cache_dir, 'parse', contents)
+    result = _to_vhd_contents(_load_cache_entry(cache_fname))
+    if result is None:
+        result = _parse_contents(contents)
+        _store_cache_entry(cache_fname, result)
+    return result
+
+def _to_vhd_contents(entry):
+    """Converts a `_VhdContents` tuple loaded from the cache back to a
+    `_VhdContents` object. Returns `None` if the entry is not valid."""
+    if not isinstance(entry, tuple):
+        return None
+    try:
+        return _VhdContents(*entry)
+    except TypeError:
+        return None
+
+def _cache_entry_fname(cache_dir, kind, key):
+    """Returns the path of the cache entry of the given kind for the given
+    key, given as a bytes-like object."""
+    import hashlib #pylint: disable=C0415
+    digest = hashlib.blake2b(key, digest_size=16).hexdigest()
+    return os.path.join(cache_dir, '%s-v%d' % (kind, _CACHE_VERSION), digest[:2], digest)
+
+def _load_cache_entry(cache_fname):
+    """Loads the cache entry at the given path. Entries are stored as JSON
+    rather than pickled, such that loading a tampered entry cannot execute
+    code. JSON arrays are converted back to tuples. Returns `None` if the
+    entry does not exist or cannot be loaded."""
+    import json #pylint: disable=C0415
+    try:
+        with open(cache_fname, 'r', encoding='utf-8') as fildes:
+            return _lists_to_tuples(json.load(fildes))
+    except Exception: #pylint: disable=W0703
+        return None
+
+def _lists_to_tuples(value):
+    """Recursively converts the lists in a value loaded from JSON to
+    tuples."""
+    if isinstance(value, list):
+        return tuple(_lists_to_tuples(item) for item in value)
+    return value
+
+def _store_cache_entry(cache_fname, value):
+    """Stores a cache entry at the given path. The entry is written atomically,
+    such that concurrent runs never see partially written entries. Failing to
+    write the cache is not an error, but the temporary file is removed again
+    in that case."""
+    import json #pylint: disable=C0415
+    import tempfile #pylint: disable=C0415
+    temp_fname = None
+    try:
+        os.makedirs(os.path.dirname(cache_fname), exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+                'w', encoding='utf-8', dir=os.path.dirname(cache_fname),
+                delete=False) as fildes:
+            temp_fname = fildes.name
+            json.dump(value, fildes)
+        os.replace(temp_fname, cache_fname)
+        temp_fname = None
+    except OSError:
+        pass
+    finally:
+        if temp_fname is not None:
+            try:
+                os.remove(temp_fname)
+            except OSError:
+                pass
+
+def _parse_contents(contents):
+    """"Parses" the contents of a VHDL file, given as bytes or another
+    bytes-like object such as an `mmap`. "Parsing" is limited to stripping
+    comments and pattern matching to keep things simple. The result is
+    returned as a `_VhdContents` tuple."""
+
+    # Gather the pragmas. They share a common prefix, so they're matched in a
+    # single pass.
+    sim_timeout = None
+    ignore = {b'entity': set(), b'component': set(), b'package': set()}
+    for match in VhdFile.PRAGMA.finditer(contents):
+        if match.lastgroup == 'timeout':
+            if sim_timeout is None:
+                sim_timeout = match.group('timeout').lower().decode('ascii')
+        else:
+            ignore[match.group('kind').lower()].add(match.group('name').lower())
+
+    # Strip comments. A comment ends at any of the line endings that reading
+    # the file in text mode would have normalized. This is done before
+    # converting to lowercase, so only a single copy of the (typically
+    # smaller) remainder is made.
+    contents = VhdFile.COMMENT.sub(b'', contents).lower()
+
+    # Identifiers are interned, so the many dictionary and set lookups during
+    # dependency resolution mostly come down to pointer comparisons.
+    def decode(ident):
+        return sys.intern(ident.decode('ascii')) if ident is not None else None
+
+    return _VhdContents(
+        entity_defs=tuple(sorted({
+            decode(match.group(1))
+            for match in VhdFile.ENTITY_DEF.finditer(contents)})),
+        entity_uses=tuple(sorted(
+            {
+                (decode(match.group(2)), decode(match.group(3)))
+                for match in VhdFile.ENTITY_USE.finditer(contents)
+                if match.group(3) not in ignore[b'entity']},
+            # The library is None for unqualified uses.
+            key=lambda use: (use[0] or '', use[1]))),
+        component_defs=tuple(sorted({
+            decode(match.group(1))
+            for match in VhdFile.COMPONENT_DEF.finditer(contents)})),
+        component_uses=tuple(sorted({
+            decode(match.group(1))
+            for match in VhdFile.COMPONENT_USE.finditer(contents)
+            if match.group(1) not in ignore[b'component']})),
+        package_defs=tuple(sorted({
+            decode(match.group(1))
+            for match in VhdFile.PACKAGE_DEF.finditer(contents)})),
+        package_uses=tuple(sorted({
+            (decode(match.group(1)), decode(match.group(2)))
+            for match in VhdFile.PACKAGE_USE.finditer(contents)
+            if match.group(2) not in ignore[b'package']})),
+        sim_timeout=sim_timeout)
+
+# Filename extensions of the files picked up by `VhdList.add_dir()`, in
+# lowercase.
+VHDL_EXTENSIONS = ('.vhd', '.vhdl')
+
+@functools.lru_cache(maxsize=4096)
+def _list_dir(dirname, mtime_ns): #pylint: disable=W0613
+    """Lists the subdirectories and VHDL files (`*.vhd` and `*.vhdl`) in the
+    given directory. Returns a tuple of `(path, is_dir, is_link)` three-tuples
+    in directory order. `mtime_ns` is not used other than as part of the cache
+    key, such that the directory is only listed again when its contents
+    change."""
+    entries = []
+    with os.scandir(dirname) as scan:
+        for entry in scan:
+            # DirEntry.is_dir() takes the file type from the directory listing
+            # itself where possible, saving a stat() call per entry. Like
+            # os.path.isdir(), it follows symlinks.
+            if entry.is_dir():
+                entries.append((entry.path, True, entry.is_symlink()))
+            elif entry.name.lower().endswith(VHDL_EXTENSIONS):
+                entries.append((entry.path, False, entry.is_symlink()))
+    return tuple(entries)
+
 class VhdList:
     """Represents a list of all VHDL files available for compilation."""
 
-    def __init__(self, mode='sim', desired_version=None, required_version=None):
+    def __init__(self, mode='sim', desired_version=None, required_version=None,
+                 jobs=None, cache_dir=None):
         """Constructs a VHDL file list. `simulation` specifies whether we're
         compiling for simulation or synthesis. `version` specifies the maximum
-        supported VHDL version of the target."""
+        supported VHDL version of the target. `jobs` optionally specifies the
+        number of worker processes used to parse the files found by
+        `add_dir()`. `cache_dir` optionally specifies a directory for caching
+        parse results across runs."""
         super().__init__()
         self.mode = mode
+        self.jobs = jobs
+        self.cache_dir = cache_dir
         self.required_version = _parse_version(required_version)
         if self.required_version is None:
             if desired_version is None:
@@ -317,27 +630,105 @@ class VhdList:
         self.order = deque()
         self.top = []
 
+        # Index from (unit_type, lib, name) design unit identifiers to the
+        # files defining them, built by determine_compile_order() such that
+        # resolving a design unit does not need to search through all files.
+        self._definitions = defaultdict(list)
+
+        # While the compile order is being determined, files are moved to the
+        # front by giving them a key greater than any key given out before;
+        # the compile order is then the files sorted by descending key. This
+        # avoids searching through and shifting the order for every move.
+        self._order_keys = {}
+        self._order_clock = itertools.count()
+
+        # Record of the add_dir() and add_file() calls made by the user, such
+        # that refresh() can replay them.
+        self._sources = []
+
     def add_dir(self, dirname, recursive=True, **kwargs):
         """Adds a directory to the VHDL file list. `dirname` specifies the root
         directory, `recursive` specifies whether we should recurse into
         subdirectories. `add_file` is called for all `*.vhd` and `*.vhdl` files
-        encountered using the specified keyword arguments."""
-        for basename in os.listdir(dirname):
-            fname = os.path.join(dirname, basename)
-            if os.path.isdir(fname):
+        encountered using the specified keyword arguments. If this list was
+        constructed with `jobs` set, the files are parsed in parallel first."""
+        self._sources.append((self._add_dir, (dirname, recursive), kwargs))
+        self._add_dir(dirname, recursive, **kwargs)
+
+    def _add_dir(self, dirname, recursive, **kwargs):
+        """Implementation of `add_dir()`, without recording the call for
+        `refresh()`."""
+        fnames = list(self._walk_dir(os.path.realpath(dirname), recursive))
+        if self.jobs is not None and self.jobs > 1:
+            _prefetch_vhds(fnames, self.jobs, kwargs.get('cache_dir', self.cache_dir))
+        for fname in fnames:
+            self._add_file(fname, canonical=True, **kwargs)
+
+    @staticmethod
+    def _walk_dir(dirname, recursive, seen=None):
+        """Yields the paths of all VHDL files in the given directory, and its
+        subdirectories if `recursive` is set. Symbolic links are followed, but
+        each directory is only visited once, as identified by its device and
+        inode number; `seen` is the set of directories visited so far. This
+        prevents symlink loops from recursing endlessly. `dirname` must be
+        canonical; the yielded paths are then canonical as well. Only symbolic
+        links need to be resolved for this, so the other entries are not
+        resolved one by one."""
+        if seen is None:
+            seen = set()
+        stat = os.stat(dirname)
+        key = (stat.st_dev, stat.st_ino)
+        if key in seen:
+            return
+        seen.add(key)
+        for fname, is_dir, is_link in _list_dir(dirname, stat.st_mtime_ns):
+            if is_link:
+                fname = os.path.realpath(fname)
+            if is_dir:
                 if recursive:
-                    self.add_dir(fname, recursive, **kwargs)
-            elif basename.lower().endswith('.vhd') or basename.lower().endswith('.vhdl'):
-                self.add_file(fname, **kwargs)
+                    yield from VhdList._walk_dir(fname, recursive, seen)
+            else:
+                yield fname
 
     def add_file(self, *args, **kwargs):
         """Adds a file to the VHDL file list. All arguments are passed directly
         to `VhdFile`'s constructor."""
+        self._sources.append((self._add_file, args, kwargs))
+        return self._add_file(*args, **kwargs)
+
+    def _add_file(self, *args, **kwargs):
+        """Implementation of `add_file()`, without recording the call for
+        `refresh()`."""
         kwargs['desired_version'] = self.desired_version
+        kwargs.setdefault('cache_dir', self.cache_dir)
         vhd = VhdFile(*args, **kwargs)
         self.files.add(vhd)
         return vhd
 
+    def refresh(self):
+        """Brings this list up to date with the filesystem after files were
+        added, removed, or modified, by redoing all previous `add_dir()` and
+        `add_file()` calls. Only files and directories that changed since they
+        were last read are parsed or listed again. The compile order is reset;
+        call `determine_compile_order()` again to recompute it. Returns whether
+        anything changed.
+
+        Changes are detected using the modification time of files and
+        directories, as well as the size of files. On filesystems with coarse
+        timestamps, a file that is added or modified without changing its
+        size within the same timestamp tick as the previous read may therefore
+        go unnoticed. Call `clear_parse_cache()` before refreshing to force
+        everything to be read again in that case."""
+        old_stamps = {vhd.fname: vhd.stamp for vhd in self.files}
+        self.files = set()
+        self.design_units = {}
+        self.order = deque()
+        self.top = []
+        for method, args, kwargs in self._sources:
+            method(*args, **dict(kwargs))
+        new_stamps = {vhd.fname: vhd.stamp for vhd in self.files}
+        return old_stamps != new_stamps
+
     def _is_file_filtered_out(self, vhd):
         """Returns a non-empty string when the given `VhdFile` is filtered out
         by this list's configuration with the reason for it being filtered out,
@@ -371,13 +762,12 @@ class VhdList:
             # specified requirements.
             options = []
             filtered_out = []
-            for vhd in self.files:
-                if vhd.lib == lib and name in getattr(vhd, unit_type + '_defs'):
-                    filter_reason = self._is_file_filtered_out(vhd)
-                    if filter_reason:
-                        filtered_out.append(filter_reason)
-                    else:
-                        options.append(vhd)
+            for vhd in self._definitions.get(ident, ()):
+                filter_reason = self._is_file_filtered_out(vhd)
+                if filter_reason:
+                    filtered_out.append(filter_reason)
+                else:
+                    options.append(vhd)
 
             # If we didn't find anything compliant, throw an error.
             if not options:
@@ -424,45 +814,61 @@ class VhdList:
 
         return vhd
 
-    def _move_to_front(self, vhd, stack=()):
+    def _move_to_front(self, vhd):
         """Moves the specified `VhdFile` object to the front of the compile
         order, taking its dependencies along with it. The file must already
         have been compiled and must already have had its dependencies
-        resolved.."""
-        if vhd in stack:
-            raise ResolutionError('circular dependency:\n - ' + '\n - '.join(map(str, stack)))
-        self.order.remove(vhd)
-        self.order.appendleft(vhd)
-        stack += (vhd,)
-        for vhd_dep in sorted(vhd.before, key=str):
-            self._move_to_front(vhd_dep, stack)
+        resolved. The dependencies are walked depth-first using an explicit
+        stack of iterators rather than by recursion, such that long dependency
+        chains cannot exceed Python's recursion limit. `path` is a dict used
+        as an insertion-ordered set of the files currently being moved, used
+        to detect cycles."""
+        self._order_keys[vhd] = next(self._order_clock)
+        path = {vhd: None}
+        stack = [(vhd, iter(vhd.before_sorted))]
+        while stack:
+            vhd_dep = next(stack[-1][1], None)
+            if vhd_dep is None:
+                del path[stack.pop()[0]]
+                continue
+            if vhd_dep in path:
+                raise ResolutionError('circular dependency:\n - ' + '\n - '.join(map(str, path)))
+            self._order_keys[vhd_dep] = next(self._order_clock)
+            path[vhd_dep] = None
+            stack.append((vhd_dep, iter(vhd_dep.before_sorted)))
 
     def _add_to_compile_order(self, vhd, strong_dependency=False):
         """Adds the given resolved VHDL file to the compile order list if it is
-        not in the list yet. If it was already in the list but this function
-        was called due to a strong dependency of another file we just added
-        (`strong_dependency` is set), the file is moved to the front of the
-        compilation list, along with all its strong dependencies recursively.
-        If this causes a cycle, a `ResolutionError` is raised."""
-
-        # Resolve the file if it hasn't been resolved yet.
-        if vhd not in self.order:
-            self.order.appendleft(vhd)
-            for dependency in sorted(vhd.before, key=str):
-                self._add_to_compile_order(dependency, True)
-            for dependency in sorted(vhd.anywhere, key=str):
-                self._add_to_compile_order(dependency, False)
-
-            # This file and its dependencies are already at the front of
-            # the compile order, so we don't need to move it to the front
-            # again even if there was a strong dependency.
-            return vhd
-
-        # Move the file to the front of the compile order list if the file
-        # whose dependencies were being resolved by the caller strongly depends
-        # on it. If we just added the file we don't need to do this.
-        if strong_dependency:
-            self._move_to_front(vhd)
+        not in the list yet, along with its dependencies. If a file was already
+        in the list but is a strong dependency of another file we just added
+        (or `strong_dependency` is set for `vhd` itself), the file is moved to
+        the front of the compilation list, along with all its strong
+        dependencies recursively. If this causes a cycle, a `ResolutionError`
+        is raised. Like `_move_to_front()`, this uses an explicit stack of
+        iterators over `(file, strong_dependency)` pairs instead of
+        recursion."""
+        stack = [iter(((vhd, strong_dependency),))]
+        while stack:
+            item = next(stack[-1], None)
+            if item is None:
+                stack.pop()
+                continue
+            dependency, strong = item
+
+            # Resolve the file if it hasn't been resolved yet. This puts the
+            # file and its dependencies at the front of the compile order, so
+            # we don't need to move it to the front again even if there was a
+            # strong dependency.
+            if dependency not in self._order_keys:
+                self._order_keys[dependency] = next(self._order_clock)
+                stack.append(itertools.chain(
+                    zip(dependency.before_sorted, itertools.repeat(True)),
+                    zip(dependency.anywhere_sorted, itertools.repeat(False))))
+
+            # Move the file to the front of the compile order list if the file
+            # whose dependencies were being resolved strongly depends on it.
+            elif strong:
+                self._move_to_front(dependency)
 
         return vhd
 
@@ -475,10 +881,15 @@ class VhdList:
         in the returned compile order. The order is returned as a list of
         `VhdFile`s."""
 
-        # Gather a list of all design units within files that were not filtered
-        # out.
+        # Index the design units defined by each file, and gather a list of
+        # all design units within files that were not filtered out.
+        self._definitions = defaultdict(list)
         units = set()
         for vhd in self.files:
+            for name in vhd.entity_defs:
+                self._definitions['entity', vhd.lib, name].append(vhd)
+            for name in vhd.package_defs:
+                self._definitions['package', vhd.lib, name].append(vhd)
             if not self._is_file_filtered_out(vhd):
                 units.update((('entity', vhd.lib, name) for name in vhd.entity_defs))
                 units.update((('package', vhd.lib, name) for name in vhd.package_defs))
@@ -486,18 +897,32 @@ class VhdList:
         # If the user specified a list of required design units, filter out
         # design units that are not required.
         if require:
-            required_units = set()
+            patterns = []
             for req in require:
                 req = req.split('.', maxsplit=1)
                 name = req[-1].lower()
                 lib = req[0].lower() if len(req) > 1 else 'work'
-                found = False
-                for etyp, elib, ename in units:
+                patterns.append((lib, name))
+
+            # Match the design units against all patterns at once. The library
+            # and unit name are joined with a null character, which cannot
+            # appear in either.
+            selector = re.compile('|'.join(
+                '(?:%s\0%s)\\Z' % (_glob_to_regex(lib), _glob_to_regex(name))
+                for lib, name in patterns))
+            required_units = {
+                (etyp, elib, ename) for etyp, elib, ename in units
+                if selector.match('%s\0%s' % (elib.lower(), ename.lower()))}
+
+            # Warn about patterns that did not match anything. Anything a
+            # pattern can match has been selected above, so only the selected
+            # units need to be checked.
+            for lib, name in patterns:
+                for _, elib, ename in required_units:
                     if fnmatch.fnmatchcase(elib.lower(), lib):
                         if fnmatch.fnmatchcase(ename.lower(), name):
-                            required_units.add((etyp, elib, ename))
-                            found = True
-                if not found:
+                            break
+                else:
                     print('Warning: %s.%s did not match anything.' % (lib, name), file=sys.stderr)
             units = required_units
 
@@ -508,19 +933,22 @@ class VhdList:
         # Resolve all the entities that we found.
         units = [self._resolve_design_unit(typ, lib, name) for typ, lib, name in units]
 
-        # Add the entities to the compile order.
+        # Add the entities to the compile order. Files that are already in the
+        # compile order from a previous call stay behind the newly added ones.
+        self._order_keys = {vhd: -index for index, vhd in enumerate(self.order)}
+        self._order_clock = itertools.count(1)
         for unit in units:
             self._add_to_compile_order(unit)
+        self.order = deque(sorted(self._order_keys, key=self._order_keys.get, reverse=True))
+        self._order_keys = {}
 
         # Store which files are not required by anything else and are thus
-        # potential toplevels. This list is sorted by the filenames to be
-        # consistent.
-        self.top = []
+        # potential toplevels, i.e. the files with no incoming dependency
+        # edges. This list is sorted by the filenames to be consistent.
+        required = set()
         for vhd in self.order:
-            if not vhd.entity_defs:
-                continue
-            for vhd2 in self.order:
-                if vhd in vhd2.anywhere or vhd in vhd2.before:
-                    break
-            else:
-                self.top.append(vhd)
+            required.update(vhd.before)
+            required.update(vhd.anywhere)
+        self.top = [
+            vhd for vhd in self.order
+            if vhd.entity_defs and vhd not in required]